@@ -1,2 +1,4 @@
 def main() -> None:
-    print("Hello from unbound-llm!")
+    from unbound_llm.cli import main as cli_main
+
+    cli_main()
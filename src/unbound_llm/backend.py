@@ -0,0 +1,115 @@
+"""Backends that create and delete sandboxes for a SandboxPool"""
+
+from pathlib import Path
+from typing import Protocol
+
+from unbound_llm.lifecycle import owner_labels
+from unbound_llm.local import LocalSandbox
+from unbound_llm.snapshots import SnapshotCache
+
+
+class SandboxBackend(Protocol):
+    def create(self):
+        """Create a sandbox and return it once it is ready for commands"""
+
+    def delete(self, sandbox) -> None:
+        """Tear the sandbox down"""
+
+    def resolve(self, sandbox, path: str) -> str:
+        """Translate an absolute in-sandbox path into one `sandbox` understands"""
+
+    def list(self, labels: dict[str, str]) -> list:
+        """Existing sandboxes carrying all of `labels`"""
+
+
+class DaytonaBackend:
+    """Creates Daytona sandboxes from one snapshot that is pinned up front.
+
+    The snapshot is resolved from the Dockerfile's content hash when the
+    backend is built, so it is only built when no snapshot matches, and every
+    sandbox the backend creates uses it without a build step. Sandboxes are
+    labelled with their owning host and process (see `owner_labels`).
+    """
+
+    def __init__(
+        self,
+        daytona,
+        dockerfile="daytona-dockerfile",
+        env_vars=None,
+        volumes=None,
+        labels=None,
+        snapshots=None,
+        on_snapshot_create_logs=print,
+    ):
+        self.daytona = daytona
+        self.snapshots = snapshots or SnapshotCache(
+            daytona, on_logs=on_snapshot_create_logs
+        )
+        self.snapshot = self.snapshots.resolve(dockerfile)
+        self.env_vars = env_vars or {}
+        self.volumes = volumes or []
+        self.labels = {**owner_labels(), **(labels or {})}
+
+    def create(self):
+        from daytona import CreateSandboxFromSnapshotParams
+
+        return self.daytona.create(
+            CreateSandboxFromSnapshotParams(
+                snapshot=self.snapshot,
+                env_vars=self.env_vars,
+                volumes=self.volumes,
+                labels=self.labels,
+            ),
+            timeout=0,
+        )
+
+    def delete(self, sandbox) -> None:
+        sandbox.delete()
+
+    def resolve(self, sandbox, path: str) -> str:
+        return path
+
+    def list(self, labels: dict[str, str]) -> list:
+        try:
+            from daytona import ListSandboxesQuery
+        except ImportError:
+            pass
+        else:
+            # Current SDKs take a query and page through the results themselves
+            return list(self.daytona.list(ListSandboxesQuery(labels=labels)))
+
+        sandboxes = []
+        page = 1
+        while True:
+            found = self.daytona.list(labels, page=page)
+            # Older SDKs return a plain list rather than a page of results
+            if isinstance(found, list):
+                return found
+            sandboxes.extend(found.items)
+            if page >= (found.total_pages or 1):
+                return sandboxes
+            page += 1
+
+
+class LocalBackend:
+    """Creates LocalSandbox instances, each rooted in its own temp directory.
+
+    In-sandbox paths are re-rooted under the sandbox directory, so pool resets
+    never touch the host's own /root or /workspace.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def create(self) -> LocalSandbox:
+        return LocalSandbox(latency=self.latency)
+
+    def delete(self, sandbox: LocalSandbox) -> None:
+        sandbox.delete()
+
+    def resolve(self, sandbox: LocalSandbox, path: str) -> str:
+        return str(Path(sandbox.root) / path.lstrip("/"))
+
+    def list(self, labels: dict[str, str]) -> list:
+        # Local sandboxes are not tracked across processes
+        return []
@@ -0,0 +1,164 @@
+"""Writing many generated files into a sandbox as one atomic commit"""
+
+import io
+import json
+import os
+import posixpath
+import shlex
+import tarfile
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from unbound_llm.manifest import BATCH_PREFIX
+from unbound_llm.tracing import span
+from unbound_llm.upload import DEFAULT_MAX_IN_FLIGHT_BYTES, upload_paths
+
+STAGING_DIR = "/tmp"
+
+
+@dataclass
+class BatchResult:
+    files: int
+    archive_bytes: int
+    seconds: float
+
+
+class BatchWriter:
+    """Stages files and publishes them together under `remote_path`.
+
+    `remote_path` becomes a symlink to a directory holding exactly the files
+    of the last commit. A commit uploads one archive and, in one exec, unpacks
+    it into a fresh sibling directory named with BATCH_PREFIX, then swaps the
+    symlink over with a rename, which is atomic, so a reader sees either the
+    previous batch or the new one in full, never a mix. If `remote_path`
+    starts out as a real directory it is moved aside and removed on the first
+    commit. Manifests skip the versioned directories, so a batch written into
+    the skills tree is not mistaken for a skill.
+
+        with BatchWriter(sandbox, "/root/.claude/skills/samples") as batch:
+            batch.add_json("data.json", {"numbers": [1, 2, 3]})
+            batch.add("notes.txt", "Hello")
+    """
+
+    def __init__(
+        self,
+        sandbox,
+        remote_path,
+        staging_path: str = STAGING_DIR,
+        max_in_flight_bytes: int = DEFAULT_MAX_IN_FLIGHT_BYTES,
+    ):
+        self.sandbox = sandbox
+        self.remote_path = str(remote_path).rstrip("/")
+        self.staging_path = staging_path
+        self.max_in_flight_bytes = max_in_flight_bytes
+        self._entries: dict[str, object] = {}
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.commit()
+
+    def add(self, relative_path: str, data: bytes | str) -> None:
+        """Stage `data` (text is UTF-8 encoded) at `relative_path`"""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._entries[_relative(relative_path)] = data
+
+    def add_json(self, relative_path: str, obj, indent: int = 2) -> None:
+        """Stage `obj`, serialized as JSON when the batch is committed"""
+        self._entries[_relative(relative_path)] = _Json(obj, indent)
+
+    def add_file(self, relative_path: str, local_path) -> None:
+        """Stage a local file, streamed from disk when the batch is committed"""
+        self._entries[_relative(relative_path)] = Path(local_path)
+
+    def commit(self) -> BatchResult:
+        """Write every staged file and swap them into place together"""
+        start = time.perf_counter()
+        batch_id = uuid.uuid4().hex[:12]
+        parent, name = posixpath.split(self.remote_path)
+        version = f"{BATCH_PREFIX}{name}.{batch_id}"
+        remote_archive = f"{self.staging_path}/{version}.tar.gz"
+        with span("batch.commit", files=len(self._entries)) as commit:
+            archive = self._pack()
+            try:
+                archive_bytes = upload_paths(
+                    self.sandbox,
+                    [(archive, remote_archive)],
+                    self.max_in_flight_bytes,
+                )
+            finally:
+                archive.unlink(missing_ok=True)
+
+            response = self.sandbox.process.exec(
+                swap_command(parent, name, version, remote_archive)
+            )
+            if response.exit_code != 0:
+                raise RuntimeError(
+                    f"Error committing batch to {self.remote_path}: {response.result}"
+                )
+            commit.set(bytes=archive_bytes)
+        result = BatchResult(
+            files=len(self._entries),
+            archive_bytes=archive_bytes,
+            seconds=time.perf_counter() - start,
+        )
+        self._entries.clear()
+        return result
+
+    def _pack(self) -> Path:
+        fd, archive = tempfile.mkstemp(prefix="unbound-batch-", suffix=".tar.gz")
+        with os.fdopen(fd, "wb") as f, tarfile.open(fileobj=f, mode="w:gz") as tar:
+            for relative_path, source in self._entries.items():
+                if isinstance(source, Path):
+                    tar.add(source, arcname=relative_path, recursive=False)
+                    continue
+                data = source.dump() if isinstance(source, _Json) else source
+                info = tarfile.TarInfo(relative_path)
+                info.size = len(data)
+                info.mtime = int(time.time())
+                info.mode = 0o644
+                tar.addfile(info, io.BytesIO(data))
+        return Path(archive)
+
+
+def swap_command(parent: str, name: str, version: str, archive: str) -> str:
+    """Unpack `archive` into `parent/version`, then point `parent/name` at it.
+
+    The previous version, or a real directory that stood at `name`, is
+    removed afterwards.
+    """
+    q = shlex.quote
+    target = q(f"{parent}/{name}")
+    staged = q(f"{parent}/{version}")
+    link = q(f"{parent}/{version}.link")
+    aside = q(f"{parent}/{version}.old")
+    return (
+        f"set -e; mkdir -p {staged}; tar -xzf {q(archive)} -C {staged}; "
+        f"rm -f {q(archive)}; "
+        f"ln -s {q(version)} {link}; old=; "
+        f"if [ -L {target} ]; then old={q(parent)}/$(readlink {target}); "
+        f"elif [ -e {target} ]; then mv {target} {aside}; old={aside}; fi; "
+        f'mv -T {link} {target}; if [ -n "$old" ]; then rm -rf "$old"; fi'
+    )
+
+
+class _Json:
+    def __init__(self, obj, indent: int):
+        self.obj = obj
+        self.indent = indent
+
+    def dump(self) -> bytes:
+        return json.dumps(self.obj, indent=self.indent).encode("utf-8")
+
+
+def _relative(path: str) -> str:
+    normalized = posixpath.normpath(path)
+    if normalized.startswith(("/", "..")) or normalized == ".":
+        raise ValueError(f"Batch paths must stay inside the batch: {path}")
+    return normalized
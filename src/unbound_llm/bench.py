@@ -0,0 +1,137 @@
+"""Benchmarks for the sync and task pipelines, run against local sandboxes.
+
+Each sandbox call sleeps for an injected latency, standing in for the round
+trip to Daytona, and the Claude CLI is replaced by a script that sleeps, so
+the numbers track the orchestration overhead rather than the model.
+"""
+
+import asyncio
+import math
+import os
+import stat
+import tempfile
+import time
+from pathlib import Path
+
+from unbound_llm.backend import LocalBackend
+from unbound_llm.executor import TaskExecutor
+from unbound_llm.local import LocalSandbox
+from unbound_llm.pool import SandboxPool
+from unbound_llm.sync import sync_directory
+from unbound_llm.tasks import Task
+from unbound_llm.tracing import tracer
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile, `q` in [0, 100]"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def make_skills_tree(root, skills: int = 20) -> Path:
+    """Generate a skills tree shaped like a real one: docs, scripts and a binary"""
+    root = Path(root)
+    for index in range(skills):
+        skill_dir = root / f"skill-{index}"
+        (skill_dir / "scripts").mkdir(parents=True, exist_ok=True)
+        (skill_dir / "SKILL.md").write_text(f"# Skill {index}\n\n" + "Usage.\n" * 40)
+        (skill_dir / "scripts" / "run.py").write_text("print('hello')\n" * 50)
+        (skill_dir / "icon.bin").write_bytes(os.urandom(4096))
+    return root
+
+
+def fake_claude(directory, seconds: float) -> Path:
+    """A stand-in `claude` executable that sleeps and then answers"""
+    script = Path(directory) / "claude"
+    script.write_text(f"#!/bin/sh\nsleep {seconds}\necho done\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return script
+
+
+def bench_sync(latency: float, skills: int = 20, repeat: int = 10) -> dict:
+    with tempfile.TemporaryDirectory() as scratch:
+        local_path = make_skills_tree(Path(scratch) / "skills", skills)
+        sandbox = LocalSandbox(latency=latency)
+        try:
+            full, incremental = [], []
+            for attempt in range(repeat):
+                remote_path = sandbox.root / f"full-{attempt}"
+                full.append(sync_directory(sandbox, local_path, remote_path))
+                incremental.append(
+                    sync_directory(sandbox, local_path, remote_path, incremental=True)
+                )
+        finally:
+            sandbox.delete()
+
+    full_seconds = [result.total_seconds for result in full]
+    incremental_seconds = [result.total_seconds for result in incremental]
+    return {
+        "sync_files": full[0].files,
+        "sync_full_p50": percentile(full_seconds, 50),
+        "sync_full_p99": percentile(full_seconds, 99),
+        "sync_incremental_p50": percentile(incremental_seconds, 50),
+        "sync_incremental_p99": percentile(incremental_seconds, 99),
+    }
+
+
+async def bench_tasks(
+    latency: float, tasks: int = 100, sandboxes: int = 8, task_seconds: float = 0.05
+) -> dict:
+    with tempfile.TemporaryDirectory() as scratch:
+        executable = fake_claude(scratch, task_seconds)
+        with SandboxPool(LocalBackend(latency=latency), size=sandboxes) as pool:
+            executor = TaskExecutor(pool, executable=str(executable), retries=0)
+            start = time.perf_counter()
+            results = [
+                result
+                async for result in executor.run(
+                    Task(str(index), f"prompt {index}") for index in range(tasks)
+                )
+            ]
+            wall = time.perf_counter() - start
+
+    # Task spans cover the whole task, lease and reset included
+    durations = [span.duration for span in tracer.spans if span.name == "task"]
+    return {
+        "tasks": len(results),
+        "tasks_failed": sum(not result.ok for result in results),
+        "tasks_per_second": len(results) / wall,
+        "task_p50": percentile(durations, 50),
+        "task_p99": percentile(durations, 99),
+    }
+
+
+def run_benchmarks(
+    latency: float = 0.02,
+    tasks: int = 100,
+    sandboxes: int = 8,
+    skills: int = 20,
+    task_seconds: float = 0.05,
+) -> dict:
+    """Run every benchmark and return a flat dict of metrics"""
+    tracer.clear()
+    metrics = {"latency": latency}
+    metrics.update(bench_sync(latency, skills))
+    metrics.update(asyncio.run(bench_tasks(latency, tasks, sandboxes, task_seconds)))
+    return metrics
+
+
+def regressions(current: dict, baseline: dict, tolerance: float = 0.2) -> list[str]:
+    """Metrics in `current` that are worse than `baseline` by more than `tolerance`.
+
+    Latency percentiles (keys ending in _p50 or _p99) regress when they grow;
+    throughput regresses when it drops.
+    """
+    found = []
+    for key, value in current.items():
+        if key not in baseline:
+            continue
+        before = baseline[key]
+        if key.endswith(("_p50", "_p99")) and value > before * (1 + tolerance):
+            found.append(f"{key}: {before:.4f}s -> {value:.4f}s")
+        elif key == "tasks_per_second" and value < before * (1 - tolerance):
+            found.append(f"{key}: {before:.2f} -> {value:.2f}")
+    return found
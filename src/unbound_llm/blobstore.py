@@ -0,0 +1,224 @@
+"""Content-addressed skill storage on volumes, published to many at once.
+
+Each volume keeps a store next to its skills tree:
+
+    <volume>/.unbound-store/blobs/<sha256[:2]>/<sha256>   file contents
+    <volume>/.unbound-store/trees/<tree hash>.json        published manifests
+
+A tree is a manifest (path -> size, sha256) whose files all point at blobs.
+Publishing uploads each distinct blob once, however many files or volumes
+share it, and only if some target volume lacks it. Each volume then copies
+in the blobs it is missing and materializes the tree from its own store as
+hard links, so a file's contents are stored once per volume however many
+paths share them, and Claude reads skills exactly as before. Where the
+filesystem has no hard links the files are copies instead. A tree file is
+the blob itself, so it must be replaced rather than edited in place.
+"""
+
+import json
+import shlex
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from unbound_llm.manifest import (
+    MANIFEST_NAME,
+    STORE_NAME,
+    build_manifest,
+    dump_manifest,
+    manifest_hash,
+)
+from unbound_llm.sync import pack_directory
+from unbound_llm.tracing import span
+from unbound_llm.upload import DEFAULT_MAX_IN_FLIGHT_BYTES, upload_paths
+
+STAGING_DIR = "/tmp/unbound-publish"
+
+# Run with python3 inside a sandbox: prints {root: [blob digests]} for the
+# store under each root in argv[2:], argv[1] being the store's name
+LIST_BLOBS_SCRIPT = """
+import json, os, sys
+store, roots = sys.argv[1], sys.argv[2:]
+found = {}
+for root in roots:
+    blobs = os.path.join(root, store, "blobs")
+    found[root] = [
+        name
+        for directory, _, names in os.walk(blobs)
+        for name in names
+        if not name.endswith(".tmp")
+    ]
+print(json.dumps(found))
+"""
+
+# Run with python3 inside a sandbox after the staging archive is unpacked.
+# argv: staging dir, tree hash, manifest name, store name, volume roots...
+# Copies missing blobs into each root's store, records the tree, links
+# changed files to their blobs and deletes files the last publish (or sync)
+# wrote that the tree no longer has, along with directories that leaves
+# empty. Prints {root: blobs written}.
+PUBLISH_SCRIPT = """
+import json, os, shutil, sys
+staging, tree_hash, manifest_name, store = sys.argv[1:5]
+with open(os.path.join(staging, "trees", tree_hash + ".json")) as f:
+    tree = json.load(f)
+
+def place(source, target, link=False):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.lexists(target + ".tmp"):
+        os.remove(target + ".tmp")
+    try:
+        if not link:
+            raise OSError
+        os.link(source, target + ".tmp")
+    except OSError:
+        shutil.copyfile(source, target + ".tmp")
+    os.replace(target + ".tmp", target)
+
+def blob(root, digest):
+    return os.path.join(root, "blobs", digest[:2], digest)
+
+written = {}
+for root in sys.argv[5:]:
+    store_root = os.path.join(root, store)
+    count = 0
+    for digest in sorted({entry["sha256"] for entry in tree.values()}):
+        if not os.path.exists(blob(store_root, digest)):
+            place(blob(staging, digest), blob(store_root, digest))
+            count += 1
+    place(
+        os.path.join(staging, "trees", tree_hash + ".json"),
+        os.path.join(store_root, "trees", tree_hash + ".json"),
+    )
+    try:
+        with open(os.path.join(root, manifest_name)) as f:
+            old = json.load(f)
+    except (OSError, ValueError):
+        old = {}
+    for path, entry in tree.items():
+        target = os.path.join(root, path)
+        unchanged = old.get(path, {}).get("sha256") == entry["sha256"]
+        if not (unchanged and os.path.isfile(target)):
+            place(blob(store_root, entry["sha256"]), target, link=True)
+    for path in old:
+        if path in tree:
+            continue
+        try:
+            os.remove(os.path.join(root, path))
+        except OSError:
+            pass
+        parent = os.path.dirname(path)
+        while parent:
+            try:
+                os.rmdir(os.path.join(root, parent))
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+    with open(os.path.join(root, manifest_name), "w") as f:
+        json.dump(tree, f, indent=1, sort_keys=True)
+    written[root] = count
+shutil.rmtree(staging, ignore_errors=True)
+print(json.dumps(written))
+"""
+
+
+@dataclass
+class PublishResult:
+    tree: str
+    files: int
+    blobs: int
+    blobs_uploaded: int = 0
+    archive_bytes: int = 0
+    # Blobs each volume root had to store, keyed by root
+    blobs_written: dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+def blob_path(digest: str) -> str:
+    """A blob's path relative to the store"""
+    return f"blobs/{digest[:2]}/{digest}"
+
+
+def list_blobs(sandbox, remote_paths) -> dict[str, set[str]]:
+    """The blob digests already in each volume's store, in one exec"""
+    command = shlex.join(
+        ["python3", "-c", LIST_BLOBS_SCRIPT, STORE_NAME, *map(str, remote_paths)]
+    )
+    response = sandbox.process.exec(command)
+    if response.exit_code != 0:
+        raise RuntimeError(f"Error listing blobs: {response.result}")
+    return {root: set(digests) for root, digests in json.loads(response.result).items()}
+
+
+def publish_tree(
+    sandbox,
+    local_path,
+    remote_paths,
+    staging_path: str = STAGING_DIR,
+    max_in_flight_bytes: int = DEFAULT_MAX_IN_FLIGHT_BYTES,
+) -> PublishResult:
+    """Publish the tree at `local_path` to every volume root in `remote_paths`.
+
+    The roots are typically several volumes mounted in the same sandbox. Three
+    round trips cover any number of them: one exec listing their blobs, one
+    upload of an archive holding the union of the missing blobs plus the tree
+    manifest, and one exec that unpacks it and updates every root.
+    """
+    start = time.perf_counter()
+    remote_paths = [str(path) for path in remote_paths]
+    manifest = build_manifest(local_path)
+    tree = manifest_hash(manifest)
+    # One local file stands in for every file with the same content
+    sources = {}
+    for relative_path, entry in manifest.items():
+        sources.setdefault(entry["sha256"], relative_path)
+    result = PublishResult(tree=tree, files=len(manifest), blobs=len(sources))
+
+    with span("publish", tree=tree, volumes=len(remote_paths)) as publish:
+        existing = list_blobs(sandbox, remote_paths)
+        missing = {
+            digest
+            for digest in sources
+            if any(digest not in existing.get(root, set()) for root in remote_paths)
+        }
+        relative_paths = sorted(sources[digest] for digest in missing)
+        archive, result.blobs_uploaded = pack_directory(
+            local_path,
+            relative_paths,
+            extra={f"trees/{tree}.json": dump_manifest(manifest)},
+            arcnames={sources[digest]: blob_path(digest) for digest in missing},
+        )
+        # Unique per publish, so concurrent publishes never share a staging dir
+        staging_path = f"{staging_path}-{uuid.uuid4().hex[:12]}"
+        try:
+            remote_archive = f"{staging_path}.tar.gz"
+            result.archive_bytes = upload_paths(
+                sandbox, [(archive, remote_archive)], max_in_flight_bytes
+            )
+        finally:
+            archive.unlink(missing_ok=True)
+
+        staging = shlex.quote(staging_path)
+        script = shlex.join(
+            [
+                "python3",
+                "-c",
+                PUBLISH_SCRIPT,
+                staging_path,
+                tree,
+                MANIFEST_NAME,
+                STORE_NAME,
+                *remote_paths,
+            ]
+        )
+        response = sandbox.process.exec(
+            f"rm -rf {staging} && mkdir -p {staging} && "
+            f"tar -xzf {shlex.quote(remote_archive)} -C {staging} && "
+            f"rm -f {shlex.quote(remote_archive)} && {script}"
+        )
+        if response.exit_code != 0:
+            raise RuntimeError(f"Error publishing tree {tree}: {response.result}")
+        result.blobs_written = json.loads(response.result.strip().splitlines()[-1])
+        publish.set(blobs_uploaded=result.blobs_uploaded, bytes=result.archive_bytes)
+    result.seconds = time.perf_counter() - start
+    return result
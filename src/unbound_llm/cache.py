@@ -0,0 +1,94 @@
+"""On-disk cache of task results keyed by prompt, CLI flags and skills state"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    skills_hash TEXT NOT NULL,
+    output TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+CREATE INDEX IF NOT EXISTS results_skills_hash ON results (skills_hash);
+"""
+
+
+class ResultCache:
+    """SQLite-backed cache of successful task outputs.
+
+    Entries expire `ttl` seconds after they were stored, and once there are
+    more than `max_entries` the least recently used are evicted. Every key
+    includes the hash of the skills tree the task ran against, so a change to
+    the skills makes the old entries unreachable; `invalidate_skills` also
+    deletes them.
+    """
+
+    def __init__(self, path, ttl: float = 24 * 3600, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    @staticmethod
+    def key(prompt: str, flags, skills_hash: str) -> str:
+        material = json.dumps([prompt, list(flags), skills_hash])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """The cached output for `key`, or None if missing or expired"""
+        now = time.time()
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT output, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE results SET last_used = ? WHERE key = ?", (now, key)
+            )
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, skills_hash: str, output: str) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, skills_hash, output, now, now),
+            )
+            self._db.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def invalidate_skills(self, skills_hash: str) -> int:
+        """Delete entries made against any skills state but `skills_hash`"""
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "DELETE FROM results WHERE skills_hash != ?", (skills_hash,)
+            )
+        return cursor.rowcount
+
+    def expire(self) -> int:
+        """Delete entries older than the TTL"""
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+        return cursor.rowcount
@@ -0,0 +1,319 @@
+"""Command line interface behind the `unbound-llm` script"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from unbound_llm.client import SKILLS_VOLUME
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="unbound-llm")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run Claude prompts from a JSONL file")
+    run.add_argument("tasks", type=Path, help="JSONL file, one task per line")
+    run.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="JSONL results file (default: <tasks>.results.jsonl)",
+    )
+    run.add_argument("--sandboxes", type=int, default=2, help="warm sandboxes")
+    run.add_argument("--max-in-flight", type=int, help="concurrent tasks")
+    run.add_argument("--timeout", type=float, help="per-task timeout in seconds")
+    run.add_argument("--retries", type=int, default=2)
+    run.add_argument(
+        "--volume",
+        default=SKILLS_VOLUME,
+        help="skills volume mounted in every sandbox ('' for none)",
+    )
+    run.add_argument(
+        "--skills",
+        type=Path,
+        help="upload this skills directory instead of mounting the volume, "
+        "and harvest skills created during the run back into it",
+    )
+    run.add_argument(
+        "--local",
+        action="store_true",
+        help="run in local subprocess sandboxes instead of Daytona",
+    )
+    run.add_argument(
+        "--cache",
+        type=Path,
+        help="SQLite file caching outputs by prompt, flags and skills state",
+    )
+    run.add_argument(
+        "--cache-ttl", type=float, default=24 * 3600, help="seconds per entry"
+    )
+    run.add_argument("--cache-size", type=int, default=10_000, help="max entries")
+    run.add_argument(
+        "--requests-per-minute",
+        type=float,
+        help="API request quota; enables the rate-limit scheduler",
+    )
+    run.add_argument(
+        "--tokens-per-minute",
+        type=float,
+        help="API token quota; enables the rate-limit scheduler",
+    )
+    run.add_argument(
+        "--tokens-per-task",
+        type=int,
+        default=20_000,
+        help="tokens charged per attempt until its real usage is known",
+    )
+    run.add_argument(
+        "--requests-per-task",
+        type=int,
+        default=1,
+        help="API requests charged per attempt until its turns are known",
+    )
+    run.add_argument(
+        "--usage",
+        type=Path,
+        help="SQLite file recording which skills each task read (for prune)",
+    )
+    run.add_argument(
+        "--session",
+        action="store_true",
+        help="keep one warm Claude agent per sandbox instead of one per task",
+    )
+    run.add_argument(
+        "--keep-context",
+        action="store_true",
+        help="with --session, let tasks on a sandbox share one conversation",
+    )
+    add_trace_arguments(run)
+
+    bench = commands.add_parser(
+        "bench", help="benchmark sync and task pipelines on local sandboxes"
+    )
+    bench.add_argument("--latency", type=float, default=0.02, help="seconds per call")
+    bench.add_argument("--tasks", type=int, default=100)
+    bench.add_argument("--sandboxes", type=int, default=8)
+    bench.add_argument("--skills", type=int, default=20)
+    bench.add_argument("-o", "--output", type=Path, help="write metrics as JSON")
+    bench.add_argument(
+        "--baseline",
+        type=Path,
+        help="metrics JSON to compare against; exit 1 on a regression",
+    )
+    bench.add_argument("--tolerance", type=float, default=0.2)
+    add_trace_arguments(bench)
+
+    prune = commands.add_parser(
+        "prune", help="evict cold skills from the skills volume"
+    )
+    prune.add_argument(
+        "--usage", type=Path, required=True, help="usage file written by run"
+    )
+    prune.add_argument("--volume", default=SKILLS_VOLUME)
+    prune.add_argument(
+        "--max-age", type=float, help="evict skills unused for this many days"
+    )
+    prune.add_argument("--max-skills", type=int, help="keep at most this many skills")
+    prune.add_argument("--max-bytes", type=int, help="keep at most this many bytes")
+    prune.add_argument(
+        "--pin",
+        action="append",
+        default=["skill-creator"],
+        help="never evict this skill (repeatable; skill-creator is always pinned)",
+    )
+    prune.add_argument(
+        "--archive", type=Path, help="copy evicted skills into this directory first"
+    )
+    prune.add_argument(
+        "--dry-run", action="store_true", help="only list what would be evicted"
+    )
+    add_trace_arguments(prune)
+
+    publish = commands.add_parser(
+        "publish", help="publish a skills directory to one or more volumes"
+    )
+    publish.add_argument("skills", type=Path, help="local skills directory")
+    publish.add_argument(
+        "--volume",
+        action="append",
+        dest="volumes",
+        help=f"target volume (repeatable; default {SKILLS_VOLUME})",
+    )
+    add_trace_arguments(publish)
+    return parser
+
+
+def add_trace_arguments(parser) -> None:
+    parser.add_argument("--trace", type=Path, help="export spans to this file")
+    parser.add_argument("--trace-format", choices=("json", "otlp"), default="json")
+
+
+def main(argv=None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.keep_context and not args.session:
+        parser.error("--keep-context requires --session")
+    try:
+        if args.command == "run":
+            run(args)
+        elif args.command == "bench":
+            bench(args)
+        elif args.command == "prune":
+            prune(args)
+        elif args.command == "publish":
+            publish(args)
+    finally:
+        if args.trace:
+            from unbound_llm.tracing import tracer
+
+            tracer.export(args.trace, args.trace_format)
+
+
+def make_backend(args):
+    if args.local:
+        from unbound_llm.backend import LocalBackend
+
+        return LocalBackend()
+
+    from unbound_llm.client import daytona_backend
+
+    return daytona_backend(volume=None if args.skills else args.volume)
+
+
+def run(args) -> None:
+    from unbound_llm.cache import ResultCache
+    from unbound_llm.client import get_lifecycle
+    from unbound_llm.executor import TaskExecutor
+    from unbound_llm.pool import SandboxPool
+    from unbound_llm.runner import run_file
+    from unbound_llm.scheduler import RateLimitScheduler
+    from unbound_llm.usage import SkillUsage
+
+    output = args.output or args.tasks.with_name(args.tasks.stem + ".results.jsonl")
+    cache = None
+    if args.cache:
+        cache = ResultCache(args.cache, ttl=args.cache_ttl, max_entries=args.cache_size)
+    usage = SkillUsage(args.usage) if args.usage else None
+    scheduler = None
+    if args.requests_per_minute or args.tokens_per_minute:
+        scheduler = RateLimitScheduler(
+            requests_per_minute=args.requests_per_minute,
+            tokens_per_minute=args.tokens_per_minute,
+            tokens_per_task=args.tokens_per_task,
+            requests_per_task=args.requests_per_task,
+            max_concurrency=args.max_in_flight or args.sandboxes,
+        )
+    backend = make_backend(args)
+    with SandboxPool(
+        backend,
+        size=args.sandboxes,
+        baseline=args.skills,
+        harvest_to=args.skills,
+        lifecycle=get_lifecycle(backend),
+    ) as pool:
+        executor = TaskExecutor(
+            pool,
+            max_in_flight=args.max_in_flight,
+            timeout=args.timeout,
+            retries=args.retries,
+            cache=cache,
+            scheduler=scheduler,
+            usage=usage,
+            sessions=args.session,
+            keep_context=args.keep_context,
+        )
+        try:
+            succeeded, failed = asyncio.run(run_file(executor, args.tasks, output))
+        finally:
+            executor.close()
+    print(f"{succeeded} succeeded, {failed} failed; results in {output}")
+    if cache:
+        print(f"Cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
+    if usage:
+        usage.close()
+
+
+def bench(args) -> None:
+    from unbound_llm.bench import regressions, run_benchmarks
+
+    metrics = run_benchmarks(
+        latency=args.latency,
+        tasks=args.tasks,
+        sandboxes=args.sandboxes,
+        skills=args.skills,
+    )
+    print(json.dumps(metrics, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(metrics, indent=2) + "\n")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        found = regressions(metrics, baseline, args.tolerance)
+        for regression in found:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+def prune(args) -> None:
+    from unbound_llm.client import daytona_backend
+    from unbound_llm.client import sandbox as create_sandbox
+    from unbound_llm.harvest import HARVEST_ARCHIVE, read_sandbox_manifest
+    from unbound_llm.pool import SKILLS_PATH
+    from unbound_llm.usage import SkillUsage, plan_prune, prune_skills
+
+    usage = SkillUsage(args.usage)
+    backend = daytona_backend(volume=args.volume)
+    try:
+        with create_sandbox(backend) as sandbox:
+            skills_path = backend.resolve(sandbox, SKILLS_PATH)
+            plan = plan_prune(
+                read_sandbox_manifest(sandbox, skills_path),
+                usage,
+                max_age=args.max_age * 86400 if args.max_age is not None else None,
+                max_skills=args.max_skills,
+                max_bytes=args.max_bytes,
+                pinned=set(args.pin),
+            )
+            for name, reason in plan.evict.items():
+                print(f"{name}: {reason}")
+            if not args.dry_run:
+                usage.seen(plan.kept)
+                prune_skills(
+                    sandbox,
+                    skills_path,
+                    plan.evict,
+                    archive_to=args.archive,
+                    archive_path=backend.resolve(sandbox, HARVEST_ARCHIVE),
+                )
+                usage.forget(plan.evict)
+    finally:
+        usage.close()
+    print(
+        f"{'Would evict' if args.dry_run else 'Evicted'} {len(plan.evict)} "
+        f"skills; {len(plan.kept)} kept, {plan.bytes_before} -> "
+        f"{plan.bytes_after} bytes"
+    )
+
+
+def publish(args) -> None:
+    from unbound_llm.blobstore import publish_tree
+    from unbound_llm.client import daytona_backend, sandbox
+
+    volumes = args.volumes or [SKILLS_VOLUME]
+    mounts = {name: f"/volumes/{name}" for name in volumes}
+    with sandbox(daytona_backend(mounts=mounts)) as box:
+        result = publish_tree(box, args.skills, list(mounts.values()))
+    print(
+        f"Published tree {result.tree[:12]} ({result.files} files, {result.blobs} "
+        f"blobs) in {result.seconds:.2f}s; uploaded {result.blobs_uploaded} blobs "
+        f"({result.archive_bytes} bytes)"
+    )
+    for name, path in mounts.items():
+        print(f"  {name}: {result.blobs_written.get(path, 0)} new blobs")
+
+
+if __name__ == "__main__":
+    main()
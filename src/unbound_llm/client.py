@@ -0,0 +1,112 @@
+"""One Daytona client per process, and sandboxes that are always torn down.
+
+The SDK is imported on first use rather than at import time, so commands that
+never reach Daytona (local runs, benchmarks, --help) do not pay for it. The
+client is created once and shared, so its HTTP connection pool and the
+snapshot lookup are reused by every backend and script in the process.
+
+Sandboxes are deleted in the background by one lifecycle per backend, which
+also sweeps away sandboxes that earlier, crashed processes left behind.
+"""
+
+import functools
+import os
+from contextlib import contextmanager
+
+from unbound_llm.backend import DaytonaBackend
+from unbound_llm.lifecycle import SandboxLifecycle
+from unbound_llm.pool import SKILLS_PATH
+from unbound_llm.snapshots import SnapshotCache
+from unbound_llm.tracing import span
+
+SKILLS_VOLUME = "claude-skills"
+
+
+@functools.cache
+def get_client():
+    """The process-wide Daytona client, configured from the environment"""
+    from daytona import Daytona, DaytonaConfig
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return Daytona(DaytonaConfig(api_key=os.getenv("DAYTONA_API_KEY")))
+
+
+@functools.cache
+def get_volume(name: str = SKILLS_VOLUME):
+    """Get a volume by name, creating it if it does not exist yet"""
+    return get_client().volume.get(name, create=True)
+
+
+def volume_mount(name: str = SKILLS_VOLUME, mount_path: str = SKILLS_PATH):
+    from daytona import VolumeMount
+
+    return VolumeMount(volumeId=get_volume(name).id, mountPath=mount_path)
+
+
+def sandbox_env() -> dict[str, str]:
+    """Environment for sandboxes that run Claude"""
+    return {"ANTHROPIC_API_KEY": os.getenv("ANTHROPIC_API_KEY"), "IS_SANDBOX": "1"}
+
+
+@functools.cache
+def get_snapshots() -> SnapshotCache:
+    return SnapshotCache(get_client(), on_logs=print)
+
+
+@functools.cache
+def _backend(mounts: tuple[tuple[str, str], ...], dockerfile: str) -> DaytonaBackend:
+    return DaytonaBackend(
+        get_client(),
+        dockerfile=dockerfile,
+        env_vars=sandbox_env(),
+        volumes=[volume_mount(name, path) for name, path in mounts],
+        snapshots=get_snapshots(),
+    )
+
+
+def daytona_backend(
+    volume: str | None = SKILLS_VOLUME,
+    dockerfile: str = "daytona-dockerfile",
+    mounts: dict[str, str] | None = None,
+) -> DaytonaBackend:
+    """Backend on the shared client, mounting `volume` at the skills path.
+
+    `mounts` maps volume names to mount paths, to mount several volumes in
+    place of `volume`. Backends are cached per mounts and Dockerfile, and all
+    share one snapshot cache, so each snapshot is resolved once per process.
+    """
+    get_client()  # loads .env before the environment is read
+    if mounts is None:
+        mounts = {volume: SKILLS_PATH} if volume else {}
+    return _backend(tuple(sorted(mounts.items())), dockerfile)
+
+
+@functools.cache
+def get_lifecycle(backend) -> SandboxLifecycle:
+    """The process-wide lifecycle for `backend`, swept once when first used"""
+    lifecycle = SandboxLifecycle(backend)
+    try:
+        lifecycle.sweep()
+    except Exception as e:
+        print(f"Error sweeping orphaned sandboxes: {e}")
+    return lifecycle
+
+
+@contextmanager
+def sandbox(backend=None):
+    """Create a sandbox for the duration of a `with` block.
+
+    When the block exits, whether or not it raised, the sandbox is queued for
+    deletion in the background; pending deletes finish before the process
+    exits. `backend` defaults to `daytona_backend()`.
+    """
+    backend = backend or daytona_backend()
+    lifecycle = get_lifecycle(backend)
+    with span("sandbox.create") as create:
+        created = backend.create()
+        create.set(sandbox_id=created.id)
+    try:
+        yield created
+    finally:
+        lifecycle.delete(created)
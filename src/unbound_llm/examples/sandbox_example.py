@@ -1,128 +1,134 @@
-import os
+import asyncio
 from pathlib import Path
 
-from daytona import (
-    CreateSandboxFromImageParams,
-    Daytona,
-    DaytonaConfig,
-    FileUpload,
-    Image,
-)
-from dotenv import load_dotenv
+from unbound_llm.client import SKILLS_VOLUME, daytona_backend, get_lifecycle
+from unbound_llm.executor import TaskExecutor
+from unbound_llm.pool import SKILLS_PATH, SandboxPool
+from unbound_llm.sync import sync_directory
+from unbound_llm.tasks import Task
 
-load_dotenv()
-
-# Define the configuration
-config = DaytonaConfig(api_key=os.getenv("DAYTONA_API_KEY"))
-
-# Initialize the Daytona client
-daytona = Daytona(config)
-
-# Create a new volume or get an existing one
-volume = daytona.volume.get("claude-skills", create=True)
-
-# Mount the volume to the sandbox
-mount_dir_1 = "/root/.claude/skills"
-
-
-# Define a simple declarative image with Python packages
-declarative_image = Image.from_dockerfile("daytona-dockerfile")
-
-# Create a new Sandbox with the declarative image and stream the build logs
-sandbox = daytona.create(
-    CreateSandboxFromImageParams(
-        image=declarative_image,
-        ephemeral=True,
-        env_vars={
-            "ANTHROPIC_API_KEY": os.getenv("ANTHROPIC_API_KEY"),
-            "IS_SANDBOX": "1",
-        },
-        # volumes=[VolumeMount(volumeId=volume.id, mountPath=mount_dir_1)],
-    ),
-    timeout=0,
-    on_snapshot_create_logs=print,
-)
-
-# Upload .claude folder directly to sandbox
-print("\n" + "=" * 80)
-print("📦 SETUP: Installing Claude Skills")
-print("=" * 80)
+# Mount the skills volume in every sandbox, so skills created by one task are
+# visible to tasks running in the other sandboxes
+mount_dir_1 = SKILLS_PATH
 
 # Get the project root directory
 project_root = Path(__file__).parent.parent.parent.parent
 claude_dir = project_root / ".claude"
 
-if not claude_dir.exists():
-    print(f"❌ .claude directory not found at {claude_dir}")
-else:
-    # Collect all files in .claude directory
-    files_to_upload = []
-    for file_path in claude_dir.rglob("*"):
-        if file_path.is_file():
-            relative_path = file_path.relative_to(claude_dir)
-            destination = f"/root/.claude/{relative_path.as_posix()}"
-
-            with open(file_path, "rb") as f:
-                files_to_upload.append(
-                    FileUpload(
-                        source=f.read(),
-                        destination=destination,
-                    )
-                )
-
-    print(f"📤 Uploading {len(files_to_upload)} files...")
-    sandbox.fs.upload_files(files_to_upload)
-    print("✓ Skills uploaded successfully")
-
-print("\n📋 Initial skills available:")
-skills_list = sandbox.process.exec(
-    "ls -1 /root/.claude/skills 2>/dev/null || echo '(none)'"
-)
-for skill in skills_list.result.strip().split("\n"):
-    print(f"   • {skill}")
+# Keep warm sandboxes built from the pinned image, all sharing the volume.
+# Retired sandboxes are deleted in the background, after sweeping up any that
+# an earlier, crashed run left behind
+backend = daytona_backend(SKILLS_VOLUME)
+pool = SandboxPool(backend, size=2, lifecycle=get_lifecycle(backend))
+
+
+def list_skills():
+    with pool.lease() as sandbox:
+        skills_list = sandbox.process.exec(
+            "ls -1 /root/.claude/skills 2>/dev/null || echo '(none)'"
+        )
+    for skill in skills_list.result.strip().split("\n"):
+        print(f"   • {skill}")
 
 
 # Define test requests to demonstrate skill creation and reuse
 requests = [
     # Task 1: Scrape HN comments & create a new skill for counting them
-    "How many comments are on this Hacker News discussion: https://news.ycombinator.com/item?id=45916094. Create a skill for this",
+    Task(
+        "1",
+        "How many comments are on this Hacker News discussion: https://news.ycombinator.com/item?id=45916094. Create a skill for this",
+    ),
     # Task 2: Reuse the HN skill created in Task 1 on a different discussion
-    "How many comments are on this Hacker News discussion: https://news.ycombinator.com/item?id=45969250",
+    Task(
+        "2",
+        "How many comments are on this Hacker News discussion: https://news.ycombinator.com/item?id=45969250",
+        depends_on=["1"],
+    ),
     # Task 3: Count emojis & create a new skill for emoji counting
-    "Count the number of emojis in the string 'Hello, world! 🌍'. Create a skill for this",
+    Task(
+        "3",
+        "Count the number of emojis in the string 'Hello, world! 🌍'. Create a skill for this",
+    ),
     # Task 4: Reuse the emoji counting skill created in Task 3 on a multi-line string
-    """Count the number of emojis in this multi-line string:
+    Task(
+        "4",
+        """Count the number of emojis in this multi-line string:
 'Hello! 👋 Welcome to our app 🎉
 We hope you enjoy using it! 😊
 Have a great day! ☀️'""",
+        depends_on=["3"],
+    ),
 ]
 
-# Execute requests
-for idx, prompt in enumerate(requests, 1):
-    print("\n" + "=" * 80)
-    print(f"Task #{idx}")
-    print("=" * 80)
 
-    response = sandbox.process.exec(
-        f'claude --dangerously-skip-permissions -p "{prompt}"'
+# Execute requests concurrently, printing each result as it completes. Each
+# sandbox keeps one warm Claude agent that runs every task it is leased for,
+# with the conversation cleared in between
+async def run_requests():
+    # The agents are stopped when the block exits, before the streaming demo
+    async with TaskExecutor(pool, timeout=600, sessions=True) as executor:
+        async for result in executor.run(requests):
+            print("\n" + "=" * 80)
+            print(f"Task #{result.task_id} ({result.duration:.1f}s)")
+            print("=" * 80)
+
+            if not result.ok:
+                print(f"❌ Error: {result.exit_code} {result.error or result.output}")
+            else:
+                print(result.output)
+
+            # Show skills list after each request, captured by the same exec
+            print("\n" + "-" * 80)
+            print(f"📋 Skills after Task #{result.task_id}:")
+            for skill in result.skill_names or ["(none)"]:
+                print(f"   • {skill}")
+            if result.skills_delta and result.skills_delta.added:
+                print(f"   ✨ New: {', '.join(result.skills_delta.added)}")
+
+
+# Stream one more request, printing the agent's messages as they arrive
+async def stream_request():
+    task = Task("5", "Use the emoji counting skill on 'Good night 🌙✨'")
+    executor = TaskExecutor(pool, timeout=600)
+    async with executor.stream(task) as stream:
+        async for event in stream:
+            if event["type"] != "assistant":
+                continue
+            for block in event["message"]["content"]:
+                if block["type"] == "text":
+                    print(f"   💬 {block['text']}")
+    metrics = stream.metrics
+    print(
+        f"Task #{task.id}: exit {stream.exit_code}, first event after "
+        f"{metrics.time_to_first_event or 0:.1f}s, {metrics.duration:.1f}s total, "
+        f"{metrics.input_tokens} input / {metrics.output_tokens} output tokens"
     )
 
-    if response.exit_code != 0:
-        print(f"❌ Error: {response.exit_code} {response.result}")
+
+# The pool deletes its sandboxes when the block exits, even on error
+with pool:
+    print("\n" + "=" * 80)
+    print("📦 SETUP: Installing Claude Skills")
+    print("=" * 80)
+
+    skills_dir = claude_dir / "skills"
+    if not skills_dir.exists():
+        print(f"❌ .claude/skills directory not found at {skills_dir}")
     else:
-        print(response.result)
+        with pool.lease() as sandbox:
+            result = sync_directory(sandbox, skills_dir, mount_dir_1, incremental=True)
+        print(f"✓ Skills synced successfully ({result.files} files uploaded)")
 
-    # Show skills list after each request
-    print("\n" + "-" * 80)
-    print(f"📋 Skills after Task #{idx}:")
-    skills_list = sandbox.process.exec(
-        "ls -1 /root/.claude/skills 2>/dev/null || echo '(none)'"
-    )
-    for skill in skills_list.result.strip().split("\n"):
-        print(f"   • {skill}")
+    print("\n📋 Initial skills available:")
+    list_skills()
 
-print("\n" + "=" * 80)
-print("✅ DEMO COMPLETE")
-print("=" * 80)
+    asyncio.run(run_requests())
 
-sandbox.delete()
+    print("\n" + "=" * 80)
+    print("📡 STREAMING: Task #5")
+    print("=" * 80)
+    asyncio.run(stream_request())
+
+    print("\n" + "=" * 80)
+    print("✅ DEMO COMPLETE")
+    print("=" * 80)
@@ -0,0 +1,74 @@
+import base64
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from unbound_llm.local import LocalSandbox
+from unbound_llm.sync import sync_directory
+
+# Simulated round-trip latency per sandbox call, in seconds
+latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+
+# Local path to the Claude skills folder, or a generated tree if it is missing
+local_skills_path = Path(".claude/skills")
+if not local_skills_path.exists():
+    local_skills_path = Path(tempfile.mkdtemp(prefix="skills-")) / "skills"
+    for skill in range(20):
+        skill_dir = local_skills_path / f"skill-{skill}"
+        (skill_dir / "scripts").mkdir(parents=True)
+        (skill_dir / "SKILL.md").write_text(f"# Skill {skill}\n\nDoes thing {skill}.\n")
+        (skill_dir / "scripts" / "run.py").write_text("print('hello')\n" * 50)
+        (skill_dir / "icon.bin").write_bytes(bytes(range(256)) * 4)
+
+
+# The per-file copy the volume examples used: two execs per file
+def copy_directory_per_file(sandbox, local_path, volume_path):
+    """Copy a local directory to the volume using sandbox commands"""
+    sandbox.process.exec(f"mkdir -p {volume_path}")
+    for item in local_path.rglob("*"):
+        if not item.is_file():
+            continue
+        volume_file_path = f"{volume_path}/{item.relative_to(local_path)}"
+        sandbox.process.exec(f"mkdir -p {Path(volume_file_path).parent}")
+        try:
+            content = item.read_text(encoding="utf-8")
+        except UnicodeDecodeError:
+            content = base64.b64encode(item.read_bytes()).decode("utf-8")
+            write_cmd = f"""python3 -c "
+import base64
+import sys
+with open('{volume_file_path}', 'wb') as f:
+    f.write(base64.b64decode(sys.argv[1]))
+" "{content}" """
+        else:
+            escaped_content = content.replace("'", "'\"'\"'")
+            write_cmd = f"""cat > '{volume_file_path}' << 'EOF'
+{escaped_content}
+EOF"""
+        sandbox.process.exec(write_cmd)
+
+
+files = sum(1 for item in local_skills_path.rglob("*") if item.is_file())
+print(f"Syncing {files} files from {local_skills_path} with {latency}s latency")
+
+sandbox = LocalSandbox(latency=latency)
+try:
+    start = time.perf_counter()
+    copy_directory_per_file(sandbox, local_skills_path, sandbox.root / "per-file")
+    per_file_seconds = time.perf_counter() - start
+    per_file_round_trips = sandbox.round_trips
+    print(
+        f"Per-file copy: {per_file_seconds:.3f}s over {per_file_round_trips} round trips"
+    )
+
+    sandbox.round_trips = 0
+    result = sync_directory(sandbox, local_skills_path, sandbox.root / "archive")
+    print(
+        f"Archive sync:  {result.total_seconds:.3f}s over {sandbox.round_trips} round trips "
+        f"(pack {result.pack_seconds:.3f}s, upload {result.upload_seconds:.3f}s, "
+        f"unpack {result.unpack_seconds:.3f}s, {result.archive_bytes} bytes)"
+    )
+    print(f"Speedup: {per_file_seconds / result.total_seconds:.1f}x")
+finally:
+    sandbox.delete()
@@ -0,0 +1,414 @@
+"""Run many tasks concurrently across the sandboxes of a SandboxPool"""
+
+import asyncio
+import contextlib
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import AsyncIterator, Iterable
+
+from unbound_llm.harvest import read_sandbox_manifest
+from unbound_llm.manifest import manifest_hash
+from unbound_llm.pool import SKILLS_PATH
+from unbound_llm.scheduler import is_rate_limited, usage_tokens
+from unbound_llm.session import AGENT_DIR, AgentSession
+from unbound_llm.streaming import STREAM_FLAGS, TaskStream, summarize_stream
+from unbound_llm.tasks import (
+    CLAUDE_EXECUTABLE,
+    DEFAULT_FLAGS,
+    Task,
+    TaskResult,
+    run_task,
+)
+from unbound_llm.tracing import span
+
+
+class TaskExecutor:
+    """Fans tasks out over a pool with a bounded number in flight.
+
+    Tasks are pulled from the input lazily, so at most `max_in_flight` of them
+    are running at once (plus any held back waiting on dependencies). A task
+    whose sandbox raises is retried up to `retries` times on a fresh lease; the
+    failing sandbox is retired by the pool. A task that exceeds its timeout,
+    or `timeout` when the task sets none, fails without a retry.
+
+    A task only starts once every id in its `depends_on` has succeeded, and
+    fails straight away if one of them failed. Dependencies order tasks but do
+    not share state: a task sees skills written by an earlier one only if the
+    skills directory is a shared volume rather than part of the pool baseline.
+
+    Unless `skills_path` is None, each task's exec also snapshots the skills
+    directory. The delta is taken against the pool baseline when the baseline
+    is that directory, and otherwise against the latest snapshot any task
+    returned (read from the sandbox when the run starts), which on a shared
+    volume may include other tasks' changes.
+
+    With a `cache`, a task whose prompt, flags and starting skills state match
+    an earlier successful run returns that output without leasing a sandbox.
+    Stale entries for other skills states are dropped when the run starts.
+
+    With a `scheduler` (see RateLimitScheduler), every attempt first waits for
+    its admission, and an attempt that fails on a rate limit is retried like a
+    sandbox failure, once the scheduler lets it back in.
+
+    With a `usage` store (see SkillUsage), Claude runs with stream-json output
+    so the skills each task read can be picked out of its tool calls; the
+    result's `output` is still the final answer. Uses are recorded along with
+    every skill seen in the snapshots.
+
+    With `sessions`, each sandbox keeps one warm agent (see AgentSession) that
+    runs every task leased to it, instead of a new Claude process per task.
+    Its conversation is cleared before each task unless `keep_context` is set.
+    `stream` still starts a process of its own. An agent is dropped when the
+    pool retires its sandbox; `close` (or leaving `async with`) stops the rest.
+    """
+
+    def __init__(
+        self,
+        pool,
+        max_in_flight: int | None = None,
+        timeout: float | None = None,
+        retries: int = 2,
+        retry_delay: float = 1.0,
+        flags=DEFAULT_FLAGS,
+        executable=CLAUDE_EXECUTABLE,
+        skills_path: str | None = SKILLS_PATH,
+        cache=None,
+        scheduler=None,
+        usage=None,
+        sessions: bool = False,
+        keep_context: bool = False,
+    ):
+        self.pool = pool
+        self.max_in_flight = max_in_flight or pool.max_size
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.flags = flags
+        self.executable = executable
+        self.skills_path = skills_path
+        self.cache = cache
+        self.scheduler = scheduler
+        self.usage = usage
+        self.sessions = sessions
+        self.keep_context = keep_context
+        self._agents: dict[str, AgentSession] = {}
+        self._agents_lock = threading.Lock()
+        if sessions:
+            pool.on_retire.append(self._forget_agent)
+        self._latest_skills = pool.baseline_manifest
+        self._skills_from_baseline = (
+            pool.has_baseline and skills_path == pool.baseline_path
+        )
+
+    async def __aenter__(self) -> "TaskExecutor":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await asyncio.to_thread(self.close)
+
+    def close(self) -> None:
+        """Stop every agent this executor started"""
+        if self._forget_agent in self.pool.on_retire:
+            self.pool.on_retire.remove(self._forget_agent)
+        with self._agents_lock:
+            agents = list(self._agents.values())
+            self._agents.clear()
+        for agent in agents:
+            agent.close()
+
+    async def run(
+        self, tasks: Iterable[Task], completed: Iterable[str] = ()
+    ) -> AsyncIterator[TaskResult]:
+        """Yield each task's result as soon as it finishes.
+
+        Ids in `completed` count as succeeded dependencies, for resuming a run
+        whose earlier tasks are already done.
+        """
+        source = iter(tasks)
+        exhausted = False
+        ready: deque[Task] = deque()
+        blocked: dict[str, Task] = {}
+        succeeded: set[str] = set(completed)
+        failed: set[str] = set()
+        running: dict[asyncio.Task, Task] = {}
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_in_flight, thread_name_prefix="task-executor"
+        ) as threads:
+            await self._prepare_skills(threads)
+            while True:
+                while len(running) < self.max_in_flight:
+                    if ready:
+                        task = ready.popleft()
+                    elif not exhausted:
+                        task = next(source, None)
+                        if task is None:
+                            exhausted = True
+                            continue
+                    else:
+                        break
+
+                    if any(dep in failed for dep in task.depends_on):
+                        failed.add(task.id)
+                        yield _dependency_failed(task)
+                    elif all(dep in succeeded for dep in task.depends_on):
+                        coroutine = self._run_with_retries(task, threads)
+                        running[asyncio.create_task(coroutine)] = task
+                    else:
+                        blocked[task.id] = task
+
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    task = running.pop(future)
+                    result = future.result()
+                    (succeeded if result.ok else failed).add(task.id)
+                    yield result
+
+                for task_id, task in list(blocked.items()):
+                    if all(
+                        dep in succeeded or dep in failed for dep in task.depends_on
+                    ):
+                        ready.append(blocked.pop(task_id))
+
+            # Whatever is still blocked depends on ids that never showed up
+            for task in blocked.values():
+                yield _dependency_failed(task)
+
+    @contextlib.asynccontextmanager
+    async def stream(self, task: Task) -> AsyncIterator[TaskStream]:
+        """Lease a sandbox and stream one task's events from it.
+
+        The task's output is yielded event by event instead of collected into
+        a TaskResult, so there is no retry, cache or skills snapshot. The
+        sandbox goes back to the pool when the block exits, and is retired if
+        the block raised. A scheduler admits the stream like any attempt and is
+        told its real token usage afterwards.
+        """
+        timeout = task.timeout or self.timeout
+        if timeout and not task.timeout:
+            task = replace(task, timeout=timeout)
+        if self.scheduler is not None:
+            await self.scheduler.acquire(task)
+        stream = sandbox = None
+        healthy = False
+        try:
+            sandbox = await asyncio.to_thread(self.pool.acquire)
+            resolve = self.pool.backend.resolve
+            skills_path = None
+            if self.skills_path is not None:
+                skills_path = resolve(sandbox, self.skills_path)
+            async with TaskStream(
+                sandbox,
+                task,
+                self.flags,
+                self.executable,
+                cwd=resolve(sandbox, self.pool.workspace),
+                skills_path=skills_path,
+            ) as stream:
+                yield stream
+            healthy = True
+            if self.usage is not None:
+                self.usage.record(stream.skills_used)
+        finally:
+            if self.scheduler is not None:
+                finished = stream is not None and stream.result is not None
+                self.scheduler.release(
+                    stream is not None and stream.rate_limited,
+                    stream.metrics.tokens if finished else None,
+                    succeeded=healthy,
+                    requests=stream.result.get("num_turns") if finished else None,
+                )
+            if sandbox is not None:
+                await asyncio.to_thread(self.pool.release, sandbox, healthy)
+
+    async def _prepare_skills(self, threads) -> None:
+        """Learn the current skills state and drop cache entries made against others"""
+        if self.skills_path is not None and not self._skills_from_baseline:
+            loop = asyncio.get_running_loop()
+            self._latest_skills = await loop.run_in_executor(threads, self._read_skills)
+        if self.cache is not None:
+            self.cache.invalidate_skills(manifest_hash(self._skills_before()))
+
+    def _read_skills(self) -> dict:
+        with self.pool.lease() as sandbox:
+            path = self.pool.backend.resolve(sandbox, self.skills_path)
+            return read_sandbox_manifest(sandbox, path, self._latest_skills)
+
+    def _skills_before(self) -> dict:
+        if self._skills_from_baseline:
+            return self.pool.baseline_manifest
+        return self._latest_skills
+
+    async def _run_with_retries(self, task: Task, threads) -> TaskResult:
+        with span("task", task_id=task.id) as task_span:
+            key = skills_hash = None
+            if self.cache is not None:
+                skills_hash = manifest_hash(self._skills_before())
+                key = self.cache.key(task.prompt, self.flags, skills_hash)
+                output = self.cache.get(key)
+                if output is not None:
+                    task_span.set(cached=True, ok=True)
+                    return TaskResult(
+                        task_id=task.id,
+                        exit_code=0,
+                        output=output,
+                        duration=0.0,
+                        attempts=0,
+                        cached=True,
+                    )
+
+            result = await self._attempt(task, threads)
+            task_span.set(
+                exit_code=result.exit_code, attempts=result.attempts, ok=result.ok
+            )
+        if key is not None and result.ok:
+            self.cache.put(key, skills_hash, result.output)
+        return result
+
+    async def _attempt(self, task: Task, threads) -> TaskResult:
+        timeout = task.timeout or self.timeout
+        if timeout and not task.timeout:
+            task = replace(task, timeout=timeout)
+        start = time.perf_counter()
+        for attempt in range(1, self.retries + 2):
+            try:
+                result = await self._execute(task, threads, timeout)
+            except TimeoutError:
+                return TaskResult(
+                    task_id=task.id,
+                    exit_code=-1,
+                    output="",
+                    duration=time.perf_counter() - start,
+                    attempts=attempt,
+                    error=f"Timed out after {timeout}s",
+                )
+            except Exception as e:
+                if attempt > self.retries:
+                    return TaskResult(
+                        task_id=task.id,
+                        exit_code=-1,
+                        output="",
+                        duration=time.perf_counter() - start,
+                        attempts=attempt,
+                        error=f"Sandbox failure: {e}",
+                    )
+                await asyncio.sleep(self.retry_delay * attempt)
+            else:
+                if self.scheduler is not None and attempt <= self.retries:
+                    if is_rate_limited(result):
+                        # The scheduler's backoff paces the retry
+                        continue
+                result.attempts = attempt
+                return result
+
+    async def _execute(self, task: Task, threads, timeout) -> TaskResult:
+        """One attempt, once the scheduler (if any) admits it.
+
+        The scheduler slot is held until the exec really returns, even if the
+        attempt has already timed out, since its API call may still be running.
+        """
+        loop = asyncio.get_running_loop()
+        if self.scheduler is not None:
+            await self.scheduler.acquire(task)
+        timed_out = False
+
+        def release(done: asyncio.Future) -> None:
+            result = None
+            if not (timed_out or done.cancelled() or done.exception()):
+                result = done.result()
+            self.scheduler.release(
+                result is not None and is_rate_limited(result),
+                result.tokens if result is not None else None,
+                succeeded=result is not None,
+                requests=result.turns if result is not None else None,
+            )
+
+        context = contextvars.copy_context()
+        attempt = loop.run_in_executor(threads, context.run, self._run_leased, task)
+        if self.scheduler is not None:
+            attempt.add_done_callback(release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(attempt), timeout)
+        except TimeoutError:
+            timed_out = True
+            raise
+
+    def _run_leased(self, task: Task) -> TaskResult:
+        with self.pool.lease() as sandbox:
+            resolve = self.pool.backend.resolve
+            skills_path = None
+            if self.skills_path is not None:
+                skills_path = resolve(sandbox, self.skills_path)
+            if self.sessions:
+                agent = self._agent(sandbox)
+                result = agent.run(
+                    task,
+                    reset=agent.tasks > 0 and not self.keep_context,
+                    skills_path=skills_path,
+                    skills_before=self._skills_before(),
+                )
+            else:
+                # stream-json carries the skills read and the API usage
+                streamed = self.usage is not None or self.scheduler is not None
+                flags = (*self.flags, *STREAM_FLAGS) if streamed else self.flags
+                result = run_task(
+                    sandbox,
+                    task,
+                    flags,
+                    self.executable,
+                    cwd=resolve(sandbox, self.pool.workspace),
+                    skills_path=skills_path,
+                    skills_before=self._skills_before(),
+                )
+                if streamed:
+                    result.output, result.skills_used, final = summarize_stream(
+                        result.output, skills_path
+                    )
+                    if final is not None:
+                        result.tokens = usage_tokens(final.get("usage") or {})
+                        result.turns = final.get("num_turns")
+            if result.skills is not None:
+                self._latest_skills = result.skills
+            if self.usage is not None:
+                self.usage.seen(result.skill_names)
+                self.usage.record(result.skills_used)
+            return result
+
+    def _agent(self, sandbox) -> AgentSession:
+        """The sandbox's agent, started on its first task"""
+        with self._agents_lock:
+            agent = self._agents.get(sandbox.id)
+            if agent is None:
+                resolve = self.pool.backend.resolve
+                agent = self._agents[sandbox.id] = AgentSession(
+                    sandbox,
+                    cwd=resolve(sandbox, self.pool.workspace),
+                    flags=self.flags,
+                    agent_dir=resolve(sandbox, AGENT_DIR),
+                )
+        return agent
+
+    def _forget_agent(self, sandbox) -> None:
+        # The agent goes down with its sandbox, so there is nothing to stop
+        with self._agents_lock:
+            self._agents.pop(sandbox.id, None)
+
+
+def _dependency_failed(task: Task) -> TaskResult:
+    return TaskResult(
+        task_id=task.id,
+        exit_code=-1,
+        output="",
+        duration=0.0,
+        attempts=0,
+        error=f"Dependency failed or missing: {', '.join(task.depends_on)}",
+    )
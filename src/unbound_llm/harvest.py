@@ -0,0 +1,98 @@
+"""Pull skills created inside a sandbox back into a local skill store"""
+
+import os
+import shlex
+import tarfile
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from unbound_llm.manifest import (
+    diff_manifests,
+    load_remote_manifest,
+    remote_manifest_command,
+)
+from unbound_llm.tracing import span
+
+HARVEST_ARCHIVE = "/tmp/unbound-harvest.tar.gz"
+
+
+@dataclass
+class HarvestResult:
+    files: list[str] = field(default_factory=list)
+    archive_bytes: int = 0
+    seconds: float = 0.0
+
+
+def read_sandbox_manifest(sandbox, remote_path, known: dict | None = None) -> dict:
+    """Hash every file under `remote_path` inside the sandbox, in one exec.
+
+    Files that match their size and mtime in `known` are not hashed again.
+    """
+    response = sandbox.process.exec(remote_manifest_command(remote_path, known))
+    if response.exit_code != 0:
+        raise RuntimeError(
+            f"Error reading manifest of {remote_path}: {response.result}"
+        )
+    return load_remote_manifest(response.result, known)
+
+
+def harvest_skills(
+    sandbox,
+    baseline_manifest: dict,
+    local_store,
+    remote_path,
+    remote_manifest: dict | None = None,
+    archive_path: str = HARVEST_ARCHIVE,
+) -> HarvestResult:
+    """Copy files that differ from `baseline_manifest` into `local_store`.
+
+    `baseline_manifest` describes what the sandbox started with, so only
+    files the sandbox itself added or changed come back; files it deleted are
+    left alone in the store. The changed files travel as one archive, packed
+    at `archive_path` in the sandbox and overwritten by the next harvest. Pass
+    `remote_manifest` when the caller already has one to skip the exec that
+    hashes the remote tree; otherwise files unchanged since the baseline are
+    not hashed again.
+    """
+    start = time.perf_counter()
+    with span("harvest", remote_path=str(remote_path)) as harvest:
+        if remote_manifest is None:
+            remote_manifest = read_sandbox_manifest(
+                sandbox, remote_path, baseline_manifest
+            )
+        changed = diff_manifests(baseline_manifest, remote_manifest).changed
+        result = HarvestResult(files=changed)
+        if changed:
+            result.archive_bytes = pull_files(
+                sandbox, remote_path, changed, local_store, archive_path
+            )
+        harvest.set(files=len(changed), bytes=result.archive_bytes)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def pull_files(
+    sandbox, remote_path, relative_paths, local_store, archive_path=HARVEST_ARCHIVE
+) -> int:
+    """Copy paths under `remote_path` into `local_store` as one archive"""
+    archive = shlex.quote(archive_path)
+    paths = " ".join(shlex.quote(path) for path in relative_paths)
+    response = sandbox.process.exec(
+        f"tar -czf {archive} -C {shlex.quote(str(remote_path))} -- {paths}"
+    )
+    if response.exit_code != 0:
+        raise RuntimeError(f"Error packing skills: {response.result}")
+
+    local_store = Path(local_store)
+    local_store.mkdir(parents=True, exist_ok=True)
+    fd, local_archive = tempfile.mkstemp(prefix="unbound-harvest-", suffix=".tar.gz")
+    os.close(fd)
+    try:
+        sandbox.fs.download_file(archive_path, local_archive)
+        with tarfile.open(local_archive, "r:gz") as tar:
+            tar.extractall(local_store, filter="data")
+        return os.path.getsize(local_archive)
+    finally:
+        os.unlink(local_archive)
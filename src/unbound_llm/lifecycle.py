@@ -0,0 +1,157 @@
+"""Deleting sandboxes in the background, and sweeping up ones that leaked"""
+
+import atexit
+import contextvars
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from unbound_llm.tracing import span
+
+# Every sandbox we create carries these labels, so a later process can tell
+# which of the account's sandboxes are ours and whether their owner is alive
+APP_LABEL = "unbound-llm"
+HOST_LABEL = "unbound-llm-host"
+PID_LABEL = "unbound-llm-pid"
+
+# Far longer than a pool lets a sandbox go without activity: idle ones are
+# evicted and leased ones refreshed every SandboxPool.evict_interval, so one
+# this quiet was left behind by a process that never got to delete it
+ORPHAN_AGE = 3 * 3600.0
+
+
+def owner_labels() -> dict[str, str]:
+    """Labels marking a sandbox as created by this process"""
+    return {
+        APP_LABEL: "1",
+        HOST_LABEL: socket.gethostname(),
+        PID_LABEL: str(os.getpid()),
+    }
+
+
+def is_orphan(sandbox, min_age: float = ORPHAN_AGE) -> bool:
+    """Whether `sandbox` was created by a process that is gone.
+
+    True when its owner ran on this host and has exited, or, for owners
+    elsewhere, when the sandbox has shown no activity for `min_age` seconds.
+    Activity is the latest of its last-activity, update and creation times,
+    whichever the SDK reports. A sandbox whose owner is alive on this host is
+    never an orphan, however old.
+    """
+    labels = getattr(sandbox, "labels", None) or {}
+    pid = int(labels.get(PID_LABEL) or 0)
+    if pid and labels.get(HOST_LABEL) == socket.gethostname():
+        return pid != os.getpid() and not _alive(pid)
+    times = [
+        _timestamp(getattr(sandbox, name, None))
+        for name in ("last_activity_at", "updated_at", "created_at")
+    ]
+    times = [t for t in times if t is not None]
+    if not times:
+        return False
+    return time.time() - max(times) > min_age
+
+
+def _timestamp(value) -> float | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SandboxLifecycle:
+    """Deletes sandboxes on a background worker pool.
+
+    `delete` returns straight away, so a caller can go on to provision the
+    next sandbox while the old one is torn down, and deleting many at once
+    takes about as long as deleting one. `flush` waits for everything still
+    pending; `close` flushes and also runs at interpreter exit, so pending
+    deletes are not lost when a script simply ends. `sweep` deletes sandboxes
+    left behind by processes that died before they could clean up.
+    """
+
+    def __init__(self, backend, workers: int = 4):
+        self.backend = backend
+        self._workers = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="sandbox-teardown"
+        )
+        self._pending: set[Future] = set()
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def __enter__(self) -> "SandboxLifecycle":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def delete(self, sandbox) -> Future:
+        """Schedule `sandbox` for deletion and return without waiting"""
+        context = contextvars.copy_context()
+        try:
+            future = self._workers.submit(context.run, self._delete, sandbox)
+        except RuntimeError:
+            # Closed, or the interpreter is shutting down: delete inline
+            future = Future()
+            self._delete(sandbox)
+            future.set_result(None)
+            return future
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait for pending deletes; False if some were still running at timeout"""
+        with self._lock:
+            pending = list(self._pending)
+        return not wait(pending, timeout).not_done
+
+    def sweep(self, min_age: float = ORPHAN_AGE) -> int:
+        """Schedule deletion of our sandboxes whose owners are gone"""
+        with span("sandbox.sweep") as sweep:
+            orphans = [
+                sandbox
+                for sandbox in self.backend.list({APP_LABEL: "1"})
+                if is_orphan(sandbox, min_age)
+            ]
+            sweep.set(orphans=len(orphans))
+        for sandbox in orphans:
+            print(f"Deleting orphaned sandbox {sandbox.id}")
+            self.delete(sandbox)
+        return len(orphans)
+
+    def close(self) -> None:
+        atexit.unregister(self.close)
+        self._workers.shutdown(wait=True)
+
+    def _delete(self, sandbox) -> None:
+        try:
+            with span("sandbox.delete", sandbox_id=sandbox.id):
+                self.backend.delete(sandbox)
+        except Exception as e:
+            print(f"Error deleting sandbox {sandbox.id}: {e}")
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
@@ -0,0 +1,176 @@
+"""Local stand-in for a Daytona sandbox, backed by a directory and subprocesses"""
+
+import asyncio
+import codecs
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class ExecResponse:
+    """Mirrors the `exit_code` / `result` shape of Daytona's ExecuteResponse"""
+
+    exit_code: int
+    result: str
+
+
+@dataclass
+class SessionCommand:
+    """Mirrors the `cmd_id` / `exit_code` shape of Daytona's session commands"""
+
+    cmd_id: str
+    exit_code: int | None = None
+
+
+class LocalProcess:
+    def __init__(self, sandbox: "LocalSandbox"):
+        self._sandbox = sandbox
+        self._sessions: dict[str, dict[str, subprocess.Popen]] = {}
+
+    def exec(self, command, cwd=None, env=None, timeout=None) -> ExecResponse:
+        """Run `command` through /bin/sh, merging stderr into the result"""
+        self._sandbox.round_trip()
+        try:
+            completed = subprocess.run(
+                ["/bin/sh", "-c", command],
+                cwd=cwd or self._sandbox.root,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                timeout=timeout or None,
+            )
+        except subprocess.TimeoutExpired as e:
+            output = (e.output or b"").decode("utf-8", errors="replace")
+            return ExecResponse(exit_code=-1, result=output)
+        return ExecResponse(
+            exit_code=completed.returncode,
+            result=completed.stdout.decode("utf-8", errors="replace"),
+        )
+
+    def create_session(self, session_id) -> None:
+        self._sandbox.round_trip()
+        self._sessions[session_id] = {}
+
+    def execute_session_command(self, session_id, req, timeout=None):
+        """Start `req.command` in the background; only async commands are run"""
+        self._sandbox.round_trip()
+        cmd_id = uuid.uuid4().hex
+        self._sessions[session_id][cmd_id] = subprocess.Popen(
+            ["/bin/sh", "-c", req.command],
+            cwd=self._sandbox.root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            # Its own process group, so deleting the session can kill the
+            # command's children too, as a sandbox does
+            start_new_session=True,
+        )
+        return SessionCommand(cmd_id=cmd_id)
+
+    def get_session_command(self, session_id, command_id) -> SessionCommand:
+        self._sandbox.round_trip()
+        process = self._sessions[session_id][command_id]
+        return SessionCommand(cmd_id=command_id, exit_code=process.poll())
+
+    async def get_session_command_logs_async(
+        self, session_id, command_id, on_stdout, on_stderr
+    ) -> None:
+        """Call back with output chunks as the command writes them, until it exits"""
+        process = self._sessions[session_id][command_id]
+        await asyncio.gather(
+            _pump(process.stdout, on_stdout), _pump(process.stderr, on_stderr)
+        )
+
+    def delete_session(self, session_id) -> None:
+        """Drop the session, killing any command still running in it"""
+        self._sandbox.round_trip()
+        self._kill(session_id)
+
+    def kill_sessions(self) -> None:
+        """Kill every session's commands, as deleting a sandbox does"""
+        for session_id in list(self._sessions):
+            self._kill(session_id)
+
+    def _kill(self, session_id) -> None:
+        for process in self._sessions.pop(session_id, {}).values():
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            process.wait()
+            process.stdout.close()
+            process.stderr.close()
+
+
+class LocalFileSystem:
+    def __init__(self, sandbox: "LocalSandbox"):
+        self._sandbox = sandbox
+
+    def upload_file(self, file, remote_path, timeout=None) -> None:
+        """Write `file` (bytes, or a local path to copy from) to `remote_path`"""
+        self._sandbox.round_trip()
+        _write(file, remote_path)
+
+    def upload_files(self, files, timeout=None) -> None:
+        """Write each FileUpload's `source` to its `destination` in one call"""
+        self._sandbox.round_trip()
+        for upload in files:
+            _write(upload.source, upload.destination)
+
+    def download_file(self, remote_path, local_path=None, timeout=None):
+        """Return the file's bytes, or stream it to `local_path` if given"""
+        self._sandbox.round_trip()
+        if local_path is None:
+            return Path(remote_path).read_bytes()
+        shutil.copyfile(remote_path, local_path)
+
+
+class LocalSandbox:
+    """A sandbox whose "remote" filesystem is the host filesystem.
+
+    Remote paths are used as-is, so callers should point them inside `root`.
+    Every exec or file transfer sleeps for `latency` seconds first, which
+    stands in for the network round trip to a real sandbox.
+    """
+
+    def __init__(self, root=None, latency: float = 0.0):
+        self.id = f"local-{uuid.uuid4().hex[:12]}"
+        self.root = Path(root or tempfile.mkdtemp(prefix="unbound-sandbox-"))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.latency = latency
+        self.round_trips = 0
+        self.process = LocalProcess(self)
+        self.fs = LocalFileSystem(self)
+
+    def round_trip(self) -> None:
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def delete(self) -> None:
+        self.process.kill_sessions()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def _write(source, remote_path) -> None:
+    destination = Path(remote_path)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(source, bytes):
+        destination.write_bytes(source)
+    else:
+        shutil.copyfile(source, destination)
+
+
+async def _pump(pipe, callback) -> None:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while chunk := await asyncio.to_thread(pipe.read1, 64 * 1024):
+        if text := decoder.decode(chunk):
+            callback(text)
+    if text := decoder.decode(b"", final=True):
+        callback(text)
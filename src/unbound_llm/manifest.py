@@ -0,0 +1,207 @@
+"""Content manifests (path, size, SHA-256) for skill trees"""
+
+import base64
+import hashlib
+import json
+import shlex
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Stored at the root of a synced directory; never listed in its own manifest
+MANIFEST_NAME = ".unbound-manifest.json"
+
+# Content-addressed blob store kept at the root of a volume (see blobstore);
+# it is not part of the tree and is never listed either
+STORE_NAME = ".unbound-store"
+
+# Prefix of the versioned directories behind a BatchWriter's symlink (see
+# batch); skipped at any depth, since the link already stands for them
+BATCH_PREFIX = ".unbound-batch-"
+
+CHUNK_SIZE = 1024 * 1024
+
+# Cap on the encoded size and mtime list passed to the remote script; it
+# travels inside the command, and one argument is limited to 128 KiB
+MAX_KNOWN_BYTES = 64 * 1024
+
+# Run with python3 inside a sandbox: prints the manifest of argv[1] as JSON,
+# with each file's mtime added, skipping the stored manifest named in argv[2],
+# the top-level directory named in argv[3] and directories prefixed by argv[4].
+# A batch is hashed through its symlink; other linked directories are skipped.
+# argv[5], if given, maps paths to a known [size, mtime] (zlib-compressed JSON
+# in base64); a file that still matches, with mtimes within a millisecond so
+# one that went through JSON or a tar header still counts, is not read, and
+# its entry is printed without "sha256" for the caller to fill in.
+REMOTE_MANIFEST_SCRIPT = """
+import base64, hashlib, json, os, sys, zlib
+root, skip, store, batch = sys.argv[1:5]
+known = {}
+if len(sys.argv) > 5:
+    known = json.loads(zlib.decompress(base64.b64decode(sys.argv[5])))
+
+links = []
+
+def walked(directory, name):
+    path = os.path.join(directory, name)
+    if name.startswith(batch) or (directory == root and name == store):
+        return False
+    if not os.path.islink(path):
+        return True
+    if not os.readlink(path).startswith(batch):
+        return False
+    links.append(os.path.relpath(path, root).replace(os.sep, "/") + "/")
+    return True
+
+manifest = {}
+for directory, subdirectories, names in os.walk(root, followlinks=True):
+    subdirectories[:] = [name for name in subdirectories if walked(directory, name)]
+    for name in names:
+        path = os.path.join(directory, name)
+        relative = os.path.relpath(path, root).replace(os.sep, "/")
+        if relative == skip or not os.path.isfile(path):
+            continue
+        try:
+            stat = os.stat(path)
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime}
+            size, mtime = known.get(relative, (None, None))
+            if size != stat.st_size or abs(mtime - stat.st_mtime) > 1e-3:
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+                entry["sha256"] = digest.hexdigest()
+        except OSError:
+            continue
+        if any(relative.startswith(link) for link in links):
+            entry["batch"] = True
+        manifest[relative] = entry
+print(json.dumps(manifest, sort_keys=True))
+"""
+
+
+@dataclass
+class ManifestDiff:
+    """Paths to upload (added or changed) and paths to delete"""
+
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.removed)
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(local_path) -> dict[str, dict]:
+    """Map each file's posix path under `local_path` to its size, hash and mtime"""
+    local_path = Path(local_path)
+    manifest = {}
+    for item in sorted(local_path.rglob("*")):
+        if not item.is_file():
+            continue
+        relative_path = item.relative_to(local_path).as_posix()
+        if relative_path == MANIFEST_NAME or _skipped(relative_path):
+            continue
+        stat = item.stat()
+        manifest[relative_path] = {
+            "size": stat.st_size,
+            "sha256": file_sha256(item),
+            "mtime": stat.st_mtime,
+        }
+    return manifest
+
+
+def _skipped(relative_path: str) -> bool:
+    directories = relative_path.split("/")[:-1]
+    return directories[:1] == [STORE_NAME] or any(
+        name.startswith(BATCH_PREFIX) for name in directories
+    )
+
+
+def diff_manifests(old: dict, new: dict) -> ManifestDiff:
+    """What has to happen to turn a tree described by `old` into `new`"""
+    return ManifestDiff(
+        changed=[
+            path
+            for path, entry in new.items()
+            if old.get(path, {}).get("sha256") != entry["sha256"]
+        ],
+        removed=[path for path in old if path not in new],
+    )
+
+
+def manifest_hash(manifest: dict) -> str:
+    """One hash for a whole tree, from its paths and contents (not mtimes)"""
+    digest = hashlib.sha256()
+    for path in sorted(manifest):
+        digest.update(f"{path}\0{manifest[path]['sha256']}\0".encode())
+    return digest.hexdigest()
+
+
+def remote_manifest_command(remote_path, known: dict | None = None) -> str:
+    """Shell command printing the manifest of a directory inside a sandbox.
+
+    Files whose size and mtime still match their entry in `known`, an earlier
+    manifest of the same tree, are not hashed again; pass the output through
+    `load_remote_manifest` with the same `known` to fill their hashes back in.
+    Files reached through a `BatchWriter` link are marked `"batch": True`.
+    """
+    arguments = [
+        "python3",
+        "-c",
+        REMOTE_MANIFEST_SCRIPT,
+        str(remote_path),
+        MANIFEST_NAME,
+        STORE_NAME,
+        BATCH_PREFIX,
+    ]
+    if encoded := _encode_known(known or {}):
+        arguments.append(encoded)
+    return shlex.join(arguments)
+
+
+def load_remote_manifest(data, known: dict | None = None) -> dict:
+    """Parse `remote_manifest_command` output, taking skipped hashes from `known`"""
+    return fill_hashes(load_manifest(data), known)
+
+
+def fill_hashes(manifest: dict, known: dict | None) -> dict:
+    """Put back the hashes a remote manifest skipped, from the `known` it was given"""
+    for path, entry in manifest.items():
+        if "sha256" not in entry:
+            entry["sha256"] = known[path]["sha256"]
+    return manifest
+
+
+def _encode_known(manifest: dict) -> str | None:
+    sizes = {
+        path: [entry["size"], entry["mtime"]]
+        for path, entry in manifest.items()
+        if "mtime" in entry
+    }
+    if not sizes:
+        return None
+    data = json.dumps(sizes, separators=(",", ":")).encode("utf-8")
+    encoded = base64.b64encode(zlib.compress(data)).decode("ascii")
+    # Too many files to pass along: hash them all instead
+    return encoded if len(encoded) <= MAX_KNOWN_BYTES else None
+
+
+def dump_manifest(manifest: dict) -> bytes:
+    return json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8")
+
+
+def load_manifest(data) -> dict:
+    """Parse a stored manifest, treating missing or corrupt data as empty"""
+    try:
+        manifest = json.loads(data)
+    except ValueError:
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
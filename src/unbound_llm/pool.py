@@ -0,0 +1,350 @@
+"""A pool of warm sandboxes that are leased to tasks and reset in between"""
+
+import shlex
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from unbound_llm.harvest import HARVEST_ARCHIVE, harvest_skills
+from unbound_llm.lifecycle import SandboxLifecycle
+from unbound_llm.manifest import build_manifest
+from unbound_llm.sync import pack_directory
+from unbound_llm.tracing import span
+
+SKILLS_PATH = "/root/.claude/skills"
+WORKSPACE = "/workspace"
+BASELINE_ARCHIVE = "/tmp/unbound-baseline.tar.gz"
+
+
+@dataclass
+class PooledSandbox:
+    sandbox: object
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    leases: int = 0
+
+
+class SandboxPool:
+    """Keeps `size` sandboxes created and ready, and hands them out on lease.
+
+    Each sandbox gets the local `baseline` directory uploaded once, as an
+    archive streamed from a local temp file and kept inside the sandbox.
+    Returning a sandbox wipes `workspace` and restores `baseline_path` from
+    that archive in a single exec, so the next lease starts from the same
+    state without another upload.
+
+    The pool grows up to `max_size` under load. Sandboxes idle for longer than
+    `idle_timeout` are evicted while the pool is above `size`, and any sandbox
+    older than `max_lifetime` is retired and replaced. Idle sandboxes are
+    checked on every acquire and, from a background thread, every
+    `evict_interval` seconds, so a quiet pool shrinks too; with
+    `evict_interval=None` that is left to calling `evict`. The same thread
+    refreshes the activity of leased sandboxes, where the SDK supports it, so
+    a long task never makes its sandbox look abandoned to another process's
+    orphan sweep.
+
+    With `harvest_to` set, files under `baseline_path` that a lease added or
+    changed are pulled back into that local directory before the reset wipes
+    them, so skills created during a run outlive the sandbox.
+
+    Retired sandboxes are deleted in the background by `lifecycle` (a private
+    SandboxLifecycle unless one is shared in), so their replacements start
+    provisioning straight away; `close` waits for the deletes to finish.
+    Callables in `on_retire` are called with each sandbox as it is retired.
+    """
+
+    def __init__(
+        self,
+        backend,
+        size: int = 2,
+        max_size: int | None = None,
+        baseline=None,
+        baseline_path: str = SKILLS_PATH,
+        workspace: str = WORKSPACE,
+        idle_timeout: float = 600.0,
+        max_lifetime: float = 3600.0,
+        evict_interval: float | None = 60.0,
+        harvest_to=None,
+        lifecycle: SandboxLifecycle | None = None,
+    ):
+        self.backend = backend
+        self.size = size
+        self.max_size = max(max_size or size, size)
+        self.baseline_path = baseline_path
+        self.workspace = workspace
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.evict_interval = evict_interval
+        self.harvest_to = harvest_to
+        self._owns_lifecycle = lifecycle is None
+        self.lifecycle = lifecycle or SandboxLifecycle(backend, workers=max(size, 1))
+        self._baseline_archive = None
+        self.baseline_manifest = {}
+        if baseline is not None and Path(baseline).exists():
+            self._baseline_archive = pack_directory(baseline)[0]
+            self.baseline_manifest = build_manifest(baseline)
+        self._harvest_lock = threading.Lock()
+        self.on_retire: list = []
+
+        self._condition = threading.Condition()
+        self._idle: deque[PooledSandbox] = deque()
+        self._leased: dict[int, PooledSandbox] = {}
+        self._creating = 0
+        self._closed = False
+        self._workers = ThreadPoolExecutor(
+            max_workers=max(size, 1), thread_name_prefix="sandbox-pool"
+        )
+        self._stopped = threading.Event()
+        self._evictor = None
+
+    def __enter__(self) -> "SandboxPool":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def has_baseline(self) -> bool:
+        return self._baseline_archive is not None
+
+    @property
+    def total(self) -> int:
+        return len(self._idle) + len(self._leased) + self._creating
+
+    def start(self) -> "SandboxPool":
+        """Create sandboxes until `size` are warm, in parallel"""
+        with self._condition:
+            missing = max(0, self.size - self.total)
+            self._creating += missing
+        futures = [self._workers.submit(self._create) for _ in range(missing)]
+        for future in futures:
+            self._add_idle(future)
+        if self.evict_interval is not None and self._evictor is None:
+            self._evictor = threading.Thread(
+                target=self._evict_periodically, name="sandbox-evictor", daemon=True
+            )
+            self._evictor.start()
+        return self
+
+    def acquire(self, timeout: float | None = None):
+        """Take a sandbox from the pool, creating one if below `max_size`"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        create = False
+        expired = []
+        try:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Sandbox pool is closed")
+                    expired += self._take_expired()
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self.total < self.max_size:
+                        self._creating += 1
+                        create = True
+                        break
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError("Timed out waiting for a sandbox")
+                    self._condition.wait(remaining)
+        finally:
+            self._delete(expired)
+
+        if create:
+            try:
+                pooled = self._create()
+            finally:
+                with self._condition:
+                    self._creating -= 1
+        with self._condition:
+            pooled.leases += 1
+            self._leased[id(pooled.sandbox)] = pooled
+        return pooled.sandbox
+
+    def release(self, sandbox, healthy: bool = True) -> None:
+        """Return a leased sandbox, resetting it, or retire it if unhealthy"""
+        with self._condition:
+            pooled = self._leased.pop(id(sandbox))
+        retire = not healthy or self._closed or self._expired(pooled)
+        if healthy and self.harvest_to is not None:
+            self._harvest(sandbox)
+        if not retire:
+            try:
+                self.reset(sandbox)
+            except Exception as e:
+                print(f"Error resetting sandbox {sandbox.id}: {e}")
+                retire = True
+
+        if retire:
+            self._delete([pooled])
+            self._replenish()
+        else:
+            with self._condition:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+                self._condition.notify()
+
+    @contextmanager
+    def lease(self, timeout: float | None = None):
+        """Context-managed acquire/release; a sandbox that raised is retired"""
+        sandbox = self.acquire(timeout)
+        try:
+            yield sandbox
+        except BaseException:
+            self.release(sandbox, healthy=False)
+            raise
+        self.release(sandbox)
+
+    def reset(self, sandbox) -> None:
+        """Wipe the workspace and restore the baseline in one exec.
+
+        The workspace is emptied rather than recreated, so a process that
+        outlives the lease with it as its working directory (an AgentSession)
+        keeps a valid one.
+        """
+        resolve = self.backend.resolve
+        workspace = shlex.quote(resolve(sandbox, self.workspace))
+        command = f"mkdir -p {workspace} && find {workspace} -mindepth 1 -delete"
+        if self._baseline_archive is not None:
+            target = shlex.quote(resolve(sandbox, self.baseline_path))
+            archive = shlex.quote(resolve(sandbox, BASELINE_ARCHIVE))
+            command += (
+                f" && rm -rf {target} && mkdir -p {target}"
+                f" && tar -xzf {archive} -C {target}"
+            )
+        with span("sandbox.reset", sandbox_id=sandbox.id):
+            response = sandbox.process.exec(command)
+        if response.exit_code != 0:
+            raise RuntimeError(f"Error resetting sandbox: {response.result}")
+
+    def evict(self) -> None:
+        """Delete idle sandboxes that are past their idle timeout or lifetime"""
+        with self._condition:
+            expired = self._take_expired()
+        self._delete(expired)
+        self._replenish()
+
+    def close(self) -> None:
+        """Delete every idle sandbox; leased ones are deleted on release"""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        self._stopped.set()
+        if self._evictor is not None:
+            self._evictor.join()
+        self._delete(idle)
+        self._workers.shutdown(wait=True)
+        if self._owns_lifecycle:
+            self.lifecycle.close()
+        else:
+            self.lifecycle.flush()
+        if self._baseline_archive is not None:
+            self._baseline_archive.unlink(missing_ok=True)
+
+    def _create(self) -> PooledSandbox:
+        with span("sandbox.create") as create:
+            sandbox = self.backend.create()
+            create.set(sandbox_id=sandbox.id)
+        try:
+            if self._baseline_archive is not None:
+                sandbox.fs.upload_file(
+                    str(self._baseline_archive),
+                    self.backend.resolve(sandbox, BASELINE_ARCHIVE),
+                )
+            self.reset(sandbox)
+        except BaseException:
+            self.lifecycle.delete(sandbox)
+            raise
+        return PooledSandbox(sandbox)
+
+    def _harvest(self, sandbox) -> None:
+        resolve = self.backend.resolve
+        try:
+            with self._harvest_lock:
+                result = harvest_skills(
+                    sandbox,
+                    self.baseline_manifest,
+                    self.harvest_to,
+                    resolve(sandbox, self.baseline_path),
+                    archive_path=resolve(sandbox, HARVEST_ARCHIVE),
+                )
+        except Exception as e:
+            print(f"Error harvesting skills from sandbox {sandbox.id}: {e}")
+            return
+        if result.files:
+            print(f"Harvested {len(result.files)} files into {self.harvest_to}")
+
+    def _add_idle(self, future) -> None:
+        try:
+            pooled = future.result()
+        except Exception as e:
+            print(f"Error creating sandbox: {e}")
+            pooled = None
+        with self._condition:
+            self._creating -= 1
+            if pooled is not None and not self._closed:
+                self._idle.append(pooled)
+                self._condition.notify()
+                pooled = None
+        if pooled is not None:
+            self._delete([pooled])
+
+    def _replenish(self) -> None:
+        with self._condition:
+            if self._closed:
+                return
+            missing = max(0, self.size - self.total)
+            self._creating += missing
+        for _ in range(missing):
+            self._workers.submit(self._create).add_done_callback(self._add_idle)
+
+    def _evict_periodically(self) -> None:
+        while not self._stopped.wait(self.evict_interval):
+            try:
+                self.evict()
+            except Exception as e:
+                print(f"Error evicting sandboxes: {e}")
+            self._refresh_leased()
+
+    def _refresh_leased(self) -> None:
+        with self._condition:
+            leased = [pooled.sandbox for pooled in self._leased.values()]
+        for sandbox in leased:
+            refresh = getattr(sandbox, "refresh_activity", None)
+            if refresh is None:
+                continue
+            try:
+                refresh()
+            except Exception as e:
+                print(f"Error refreshing sandbox {sandbox.id}: {e}")
+
+    def _expired(self, pooled: PooledSandbox) -> bool:
+        return time.monotonic() - pooled.created_at > self.max_lifetime
+
+    def _take_expired(self) -> list[PooledSandbox]:
+        """Remove expired idle sandboxes from the pool; caller holds the lock"""
+        now = time.monotonic()
+        expired = []
+        for pooled in list(self._idle):
+            idle_too_long = (
+                now - pooled.last_used > self.idle_timeout and self.total > self.size
+            )
+            if idle_too_long or self._expired(pooled):
+                self._idle.remove(pooled)
+                expired.append(pooled)
+        return expired
+
+    def _delete(self, pooled_sandboxes) -> None:
+        for pooled in pooled_sandboxes:
+            for callback in list(self.on_retire):
+                callback(pooled.sandbox)
+            self.lifecycle.delete(pooled.sandbox)
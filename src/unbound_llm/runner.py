@@ -0,0 +1,108 @@
+"""Stream tasks from a JSONL file to a JSONL results file, resumably"""
+
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterator
+
+from unbound_llm.tasks import Task
+
+
+def checkpoint_path(output_path) -> Path:
+    """Sidecar file holding the ids of tasks that completed successfully"""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + ".done")
+
+
+def read_tasks(path, skip=frozenset()) -> Iterator[Task]:
+    """Lazily parse tasks from JSONL, one object per line.
+
+    Each line needs a `prompt`; `id` defaults to the line number, and
+    `depends_on`, `timeout` and `priority` are optional. Blank lines are ignored and ids
+    in `skip` are not yielded.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            task_id = str(record.get("id", line_number))
+            if task_id in skip:
+                continue
+            yield Task(
+                id=task_id,
+                prompt=record["prompt"],
+                depends_on=[str(dep) for dep in record.get("depends_on", [])],
+                timeout=record.get("timeout"),
+                priority=record.get("priority", 0),
+            )
+
+
+def load_completed(output_path) -> set[str]:
+    """Ids recorded as done by an earlier, possibly interrupted, run"""
+    path = checkpoint_path(output_path)
+    if not path.exists():
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.endswith("\n")}
+
+
+def truncate_partial_line(path) -> None:
+    """Drop a trailing line left half-written by a crash"""
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        position = size
+        while position > 0:
+            step = min(64 * 1024, position)
+            position -= step
+            f.seek(position)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+
+async def run_file(executor, tasks_path, output_path) -> tuple[int, int]:
+    """Run every task in `tasks_path` not yet completed in `output_path`.
+
+    Results are appended to `output_path` as they finish, one JSON object per
+    line, and successful ids are appended to the checkpoint file right after.
+    Only the set of completed ids is held in memory, never the tasks or their
+    results. Returns the number of tasks that succeeded and failed.
+    """
+    done_path = checkpoint_path(output_path)
+    truncate_partial_line(output_path)
+    truncate_partial_line(done_path)
+    completed = load_completed(output_path)
+
+    succeeded = failed = 0
+    tasks = read_tasks(tasks_path, skip=completed)
+    with (
+        open(output_path, "a", encoding="utf-8") as results,
+        open(done_path, "a", encoding="utf-8") as checkpoint,
+    ):
+        async for result in executor.run(tasks, completed=completed):
+            record = asdict(result)
+            del record["skills"]
+            results.write(json.dumps(record, ensure_ascii=False) + "\n")
+            results.flush()
+            if result.ok:
+                checkpoint.write(result.task_id + "\n")
+                checkpoint.flush()
+                succeeded += 1
+                status = "ok (cached)" if result.cached else "ok"
+            else:
+                failed += 1
+                status = f"failed: {result.error or result.exit_code}"
+            print(f"{result.task_id} {status} ({result.duration:.1f}s)")
+    return succeeded, failed
@@ -0,0 +1,196 @@
+"""Admission control for tasks sharing one Anthropic API key"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import re
+import time
+
+# Failures whose output looks like the API pushing back rather than a bad task
+RATE_LIMIT_PATTERN = re.compile(
+    r"rate[ _-]?limit|too many requests|overloaded|\b(429|529)\b", re.IGNORECASE
+)
+
+# Only the end of a failed task's output is searched for a rate-limit error
+RATE_LIMIT_TAIL = 4096
+
+
+def usage_tokens(usage: dict) -> int:
+    """Tokens a run's `usage` counts against rate limits (cache reads are not)"""
+    return sum(
+        int(usage.get(name) or 0)
+        for name in ("input_tokens", "cache_creation_input_tokens", "output_tokens")
+    )
+
+
+def is_rate_limited(result) -> bool:
+    """Whether a failed TaskResult was rejected by an API rate limit"""
+    if result.ok:
+        return False
+    text = f"{result.error or ''}\n{result.output[-RATE_LIMIT_TAIL:]}"
+    return RATE_LIMIT_PATTERN.search(text) is not None
+
+
+class TokenBucket:
+    """Refills at `rate` per second up to `capacity`; may be driven into debt"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken, 0 if it can be taken now"""
+        self._refill()
+        # A request larger than the bucket only has to wait for a full one
+        missing = min(amount, self.capacity) - self.level
+        return max(missing / self.rate, 0.0)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+
+class RateLimitScheduler:
+    """Gates task attempts on request and token budgets and adaptive concurrency.
+
+    Attempts wait in a priority queue (higher `Task.priority` first, then
+    arrival order) and are admitted only while fewer than `concurrency` are
+    running and the request and token buckets, where set, can cover them. The
+    buckets hold a minute's quota and refill continuously.
+
+    An attempt is one agentic Claude run, which makes an API request per turn,
+    so it is charged `requests_per_task` requests and `tokens_per_task` tokens
+    up front. Both are corrected once the attempt reports its real number of
+    turns and token usage. Runs that report neither keep the estimate.
+
+    Concurrency follows AIMD: it grows by 1/concurrency per success and halves
+    when an attempt is rate limited. A rate limit also holds every admission
+    back for a jittered backoff that doubles while rate limits keep coming, so
+    in-flight failures and their retries do not pile onto the API at once.
+    One scheduler can be shared by several executors on the same event loop.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = 50,
+        tokens_per_minute: float | None = None,
+        tokens_per_task: int = 20_000,
+        requests_per_task: int = 1,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        backoff: float = 5.0,
+        max_backoff: float = 120.0,
+    ):
+        self.requests = self.tokens = None
+        if requests_per_minute:
+            self.requests = TokenBucket(requests_per_minute / 60, requests_per_minute)
+        if tokens_per_minute:
+            self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+        self.tokens_per_task = tokens_per_task
+        self.requests_per_task = requests_per_task
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = float(max_concurrency)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.in_flight = 0
+        self.rate_limited = 0
+        self._next_backoff = backoff
+        self._paused_until = 0.0
+        self._waiting: list = []
+        self._order = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    async def acquire(self, task) -> None:
+        """Wait until `task` may start an attempt"""
+        future = asyncio.get_running_loop().create_future()
+        entry = (-getattr(task, "priority", 0), next(self._order), future)
+        heapq.heappush(self._waiting, entry)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the waiter was cancelled: give the slot back
+                self.in_flight -= 1
+                self._dispatch()
+            raise
+
+    def release(
+        self,
+        rate_limited: bool = False,
+        tokens: int | None = None,
+        succeeded: bool = True,
+        requests: int | None = None,
+    ) -> None:
+        """Report that an attempt finished, with its real usage if known.
+
+        `tokens` and `requests` (its number of turns) replace the estimates it
+        was charged. An attempt that failed otherwise (`succeeded` False: it
+        raised or timed out) frees its slot without growing the concurrency.
+        """
+        self.in_flight -= 1
+        if tokens is not None and self.tokens is not None:
+            self.tokens.take(tokens - self.tokens_per_task)
+        if requests is not None and self.requests is not None:
+            self.requests.take(requests - self.requests_per_task)
+        if rate_limited:
+            self._on_rate_limit()
+        elif succeeded:
+            self.concurrency = min(
+                self.max_concurrency, self.concurrency + 1 / self.concurrency
+            )
+            self._next_backoff = self.backoff
+        self._dispatch()
+
+    def _on_rate_limit(self) -> None:
+        self.rate_limited += 1
+        now = time.monotonic()
+        # Attempts that were already in flight when the limit hit report it
+        # too; only the first of them backs off
+        if now < self._paused_until:
+            return
+        self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+        delay = self._next_backoff * random.uniform(1.0, 1.25)
+        self._paused_until = now + delay
+        self._next_backoff = min(self._next_backoff * 2, self.max_backoff)
+
+    def _dispatch(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        while self._waiting:
+            future = self._waiting[0][2]
+            if future.done():
+                heapq.heappop(self._waiting)
+                continue
+            if self.in_flight >= int(self.concurrency):
+                return
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self.requests.wait_time(self.requests_per_task)
+                if self.requests
+                else 0.0,
+                self.tokens.wait_time(self.tokens_per_task) if self.tokens else 0.0,
+            )
+            if wait > 0:
+                # The head of the queue waits even if a cheaper attempt behind
+                # it would fit, so priority order is kept
+                loop = asyncio.get_running_loop()
+                self._wakeup = loop.call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiting)
+            if self.requests is not None:
+                self.requests.take(self.requests_per_task)
+            if self.tokens is not None:
+                self.tokens.take(self.tokens_per_task)
+            self.in_flight += 1
+            future.set_result(None)
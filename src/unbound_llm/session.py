@@ -0,0 +1,350 @@
+"""A long-running Claude agent per sandbox, fed tasks one at a time.
+
+Running `claude -p` per task pays for Node startup, CLI initialization and
+skill discovery on every prompt. An AgentSession instead starts one agent
+process in the sandbox through claude-agent-sdk, which keeps a single Claude
+CLI process alive, and sends it each task over a Unix socket:
+
+    host --exec--> socket client --unix socket--> agent --> claude (warm)
+
+A task then costs one exec of a small Python client plus the model call.
+"""
+
+import json
+import math
+import shlex
+import time
+import uuid
+
+from unbound_llm.pool import WORKSPACE
+from unbound_llm.scheduler import usage_tokens
+from unbound_llm.streaming import skills_read
+from unbound_llm.tasks import (
+    DEFAULT_FLAGS,
+    Task,
+    TaskResult,
+    skills_delta,
+    snapshot_command,
+    split_skills_snapshot,
+)
+from unbound_llm.tracing import span
+
+# Each agent listens on <dir>/<session id>.sock, next to its .pid and .log
+AGENT_DIR = "/tmp"
+
+# How long a task waits for the agent to come up; the first task after
+# `start` waits out the CLI's startup here instead of in a separate exec
+CONNECT_TIMEOUT = 120.0
+
+# Exit code of the socket client when the agent is not running or died
+AGENT_GONE = 2
+
+# Run with python3 inside a sandbox, where the Dockerfile installs
+# claude-agent-sdk. argv: socket path, working directory, CLI flags as a JSON
+# object. Serves one JSON request per connection: {"prompt", "reset",
+# "timeout"}, answered with the run's result and the tool calls it made.
+AGENT_SCRIPT = """
+import asyncio, json, os, sys
+from claude_agent_sdk import (
+    AssistantMessage, ClaudeAgentOptions, ClaudeSDKClient, ResultMessage,
+    ToolUseBlock,
+)
+socket_path, cwd, extra_args = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+
+async def collect(client, prompt):
+    await client.query(prompt)
+    tools, result = [], None
+    async for message in client.receive_response():
+        if isinstance(message, AssistantMessage):
+            tools += [
+                {"name": block.name, "input": block.input}
+                for block in message.content
+                if isinstance(block, ToolUseBlock)
+            ]
+        elif isinstance(message, ResultMessage):
+            result = message
+    if result is None:
+        raise RuntimeError("Claude exited without a result")
+    return result, tools
+
+async def run(client, request):
+    if request.get("reset"):
+        await collect(client, "/clear")
+    timeout = request.get("timeout")
+    try:
+        result, tools = await asyncio.wait_for(
+            collect(client, request["prompt"]), timeout
+        )
+    except asyncio.TimeoutError:
+        # Stop the turn and drain it, so the next task starts clean
+        await client.interrupt()
+        async for _ in client.receive_response():
+            pass
+        return {"is_error": True, "result": f"Timed out after {timeout}s"}
+    return {
+        "result": result.result or "",
+        "is_error": result.is_error,
+        "num_turns": result.num_turns,
+        "duration_ms": result.duration_ms,
+        "cost_usd": result.total_cost_usd,
+        "usage": result.usage,
+        "session_id": result.session_id,
+        "tools": tools,
+    }
+
+async def main():
+    options = ClaudeAgentOptions(
+        cwd=cwd,
+        permission_mode="bypassPermissions",
+        setting_sources=["user", "project"],
+        extra_args=extra_args,
+    )
+    lock = asyncio.Lock()
+    async with ClaudeSDKClient(options=options) as client:
+        async def handle(reader, writer):
+            try:
+                request = json.loads(await reader.readline())
+                async with lock:
+                    reply = await run(client, request)
+            except Exception as e:
+                reply = {"is_error": True, "result": f"{type(e).__name__}: {e}"}
+            writer.write(json.dumps(reply).encode() + b"\\n")
+            await writer.drain()
+            writer.close()
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(handle, socket_path)
+        print(f"Agent listening on {socket_path}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+asyncio.run(main())
+"""
+
+# Run with python3 inside a sandbox for each task. argv: socket path, request
+# JSON, seconds to wait for the agent. Prints the agent's JSON reply; exits 0,
+# 1 if the run failed, or 2 (AGENT_GONE) if the agent is not there to answer.
+CLIENT_SCRIPT = """
+import json, socket, sys, time
+path, request, wait = sys.argv[1], sys.argv[2], float(sys.argv[3])
+
+def gone(message):
+    try:
+        with open(path + ".log") as f:
+            message += "\\n" + f.read()[-2000:]
+    except OSError:
+        pass
+    print(json.dumps({"is_error": True, "result": message}))
+    sys.exit(2)
+
+def alive():
+    try:
+        with open(path + ".pid") as f:
+            pid = int(f.read())
+    except (OSError, ValueError):
+        return True  # still starting
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return False
+
+deadline = time.monotonic() + wait
+while True:
+    conn = socket.socket(socket.AF_UNIX)
+    try:
+        conn.connect(path)
+        break
+    except OSError:
+        conn.close()
+        if not alive():
+            gone("Agent exited")
+        if time.monotonic() > deadline:
+            gone(f"Agent not listening on {path} after {wait}s")
+        time.sleep(0.1)
+conn.sendall(request.encode() + b"\\n")
+reply = conn.makefile().readline()
+if not reply:
+    gone("Agent exited mid-task")
+print(reply, end="")
+sys.exit(1 if json.loads(reply).get("is_error") else 0)
+"""
+
+
+def flag_args(flags) -> dict[str, str | None]:
+    """CLI flags as claude-agent-sdk `extra_args`: `--name [value]` pairs"""
+    args = {}
+    flags = list(flags)
+    for i, flag in enumerate(flags):
+        if not flag.startswith("--"):
+            continue
+        value = flags[i + 1] if i + 1 < len(flags) else None
+        args[flag[2:]] = None if value is None or value.startswith("--") else value
+    return args
+
+
+class AgentSession:
+    """One warm Claude agent in `sandbox`, serving tasks in `cwd`.
+
+    `start` launches the agent as a background session command and returns
+    without waiting for it; the first task waits for it to listen. Tasks run
+    one at a time and share one conversation unless run with `reset`, which
+    clears it first. `close` stops the agent by deleting its session.
+    """
+
+    def __init__(
+        self,
+        sandbox,
+        cwd: str = WORKSPACE,
+        flags=DEFAULT_FLAGS,
+        agent_dir: str = AGENT_DIR,
+        connect_timeout: float = CONNECT_TIMEOUT,
+    ):
+        self.sandbox = sandbox
+        self.cwd = cwd
+        self.flags = tuple(flags)
+        self.agent_dir = agent_dir
+        self.socket_path = None
+        self.connect_timeout = connect_timeout
+        self.session_id = None
+        self.tasks = 0
+
+    def __enter__(self) -> "AgentSession":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def running(self) -> bool:
+        return self.session_id is not None
+
+    def start(self) -> None:
+        """Launch the agent, if it is not running already"""
+        from daytona import SessionExecuteRequest
+
+        if self.running:
+            return
+        process = self.sandbox.process
+        session_id = f"unbound-agent-{uuid.uuid4().hex}"
+        path = f"{self.agent_dir}/{session_id}.sock"
+        agent = shlex.join(
+            [
+                "python3",
+                "-c",
+                AGENT_SCRIPT,
+                path,
+                self.cwd,
+                json.dumps(flag_args(self.flags)),
+            ]
+        )
+        command = (
+            f"mkdir -p {shlex.quote(self.agent_dir)} && "
+            f"echo $$ > {shlex.quote(path + '.pid')} && "
+            f"cd {shlex.quote(self.cwd)} && "
+            f"exec {agent} > {shlex.quote(path + '.log')} 2>&1"
+        )
+        with span("agent.start", sandbox_id=self.sandbox.id):
+            process.create_session(session_id)
+            try:
+                process.execute_session_command(
+                    session_id, SessionExecuteRequest(command=command, run_async=True)
+                )
+            except Exception:
+                process.delete_session(session_id)
+                raise
+        self.session_id = session_id
+        self.socket_path = path
+        self.tasks = 0
+
+    def run(
+        self,
+        task: Task,
+        reset: bool = False,
+        skills_path=None,
+        skills_before: dict | None = None,
+    ) -> TaskResult:
+        """Run one task on the agent, starting it first if needed.
+
+        Mirrors `run_task`: with `skills_path` set, the same exec snapshots the
+        skills directory afterwards. The result also lists the skills the task
+        read. Raises RuntimeError if the agent is gone, after which the next
+        `run` starts a new one.
+        """
+        self.start()
+        request = {"prompt": task.prompt, "reset": reset, "timeout": task.timeout}
+        command = shlex.join(
+            [
+                "python3",
+                "-c",
+                CLIENT_SCRIPT,
+                self.socket_path,
+                json.dumps(request),
+                str(self.connect_timeout),
+            ]
+        )
+        marker = f"__unbound_skills_{uuid.uuid4().hex}__"
+        if skills_path is not None:
+            command = snapshot_command(command, skills_path, marker, skills_before)
+        timeout = None
+        if task.timeout:
+            timeout = math.ceil(task.timeout + self.connect_timeout)
+
+        start = time.perf_counter()
+        with span(
+            "task.agent", task_id=task.id, sandbox_id=self.sandbox.id, reset=reset
+        ) as agent_span:
+            response = self.sandbox.process.exec(command, timeout=timeout)
+            agent_span.set(exit_code=response.exit_code, warm=self.tasks > 0)
+        duration = time.perf_counter() - start
+
+        text, skills = split_skills_snapshot(response.result, marker, skills_before)
+        try:
+            reply = json.loads(text.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            reply = {"result": text}
+        if response.exit_code == AGENT_GONE:
+            self.session_id = None
+            raise RuntimeError(
+                f"Error running task {task.id} in agent session: {reply['result']}"
+            )
+        self.tasks += 1
+
+        tool_calls = {
+            "type": "assistant",
+            "message": {
+                "content": [
+                    {"type": "tool_use", **tool} for tool in reply.get("tools", [])
+                ]
+            },
+        }
+        delta = None
+        if skills is not None:
+            delta = skills_delta(skills_before or {}, skills)
+        return TaskResult(
+            task_id=task.id,
+            exit_code=response.exit_code,
+            output=reply.get("result", ""),
+            duration=duration,
+            skills_delta=delta,
+            skills_used=sorted(skills_read(tool_calls, skills_path)),
+            skills=skills,
+            tokens=usage_tokens(reply["usage"]) if reply.get("usage") else None,
+            turns=reply.get("num_turns"),
+        )
+
+    def reset(self) -> None:
+        """Clear the conversation without running a task"""
+        self.run(Task("reset", "/clear"))
+
+    def close(self) -> None:
+        """Stop the agent"""
+        if not self.running:
+            return
+        session_id, self.session_id = self.session_id, None
+        try:
+            self.sandbox.process.delete_session(session_id)
+        except Exception as e:
+            print(f"Error deleting agent session {session_id}: {e}")
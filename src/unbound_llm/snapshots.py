@@ -0,0 +1,127 @@
+"""Reuse Daytona snapshots keyed by a hash of the Dockerfile and its inputs"""
+
+import hashlib
+import shlex
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from unbound_llm.manifest import file_sha256
+from unbound_llm.tracing import span
+
+SNAPSHOT_PREFIX = "unbound"
+
+# Snapshot states that will never become usable, so they count as a miss
+FAILED_STATES = {"build_failed", "error"}
+
+
+@dataclass
+class SnapshotStats:
+    hits: int = 0
+    misses: int = 0
+    build_seconds: float = 0.0
+
+
+def build_inputs(dockerfile) -> list[Path]:
+    """Local files a Dockerfile's COPY and ADD instructions pull in.
+
+    Sources are resolved against the Dockerfile's directory as the build
+    context; URLs and `--from` copies out of other stages are skipped.
+    """
+    dockerfile = Path(dockerfile)
+    context = dockerfile.parent
+    inputs = []
+    for line in dockerfile.read_text(encoding="utf-8").splitlines():
+        words = line.split()
+        if not words or words[0].upper() not in ("COPY", "ADD"):
+            continue
+        arguments = shlex.split(line, comments=True)[1:]
+        if any(argument.startswith("--from") for argument in arguments):
+            continue
+        sources = [argument for argument in arguments if not argument.startswith("--")]
+        for source in sources[:-1]:
+            if "://" in source:
+                continue
+            for path in sorted(context.glob(source)):
+                if path.is_dir():
+                    inputs.extend(sorted(p for p in path.rglob("*") if p.is_file()))
+                else:
+                    inputs.append(path)
+    return inputs
+
+
+def dockerfile_hash(dockerfile, extra_inputs=()) -> str:
+    """SHA-256 over the Dockerfile and every file that goes into the build"""
+    dockerfile = Path(dockerfile)
+    context = dockerfile.parent
+    digest = hashlib.sha256()
+    digest.update(file_sha256(dockerfile).encode())
+    for path in [*build_inputs(dockerfile), *map(Path, extra_inputs)]:
+        try:
+            name = path.relative_to(context).as_posix()
+        except ValueError:
+            name = path.as_posix()
+        digest.update(f"\0{name}\0{file_sha256(path)}".encode())
+    return digest.hexdigest()
+
+
+class SnapshotCache:
+    """Maps Dockerfiles to named snapshots, building only on a miss.
+
+    The snapshot name embeds the content hash, so an unchanged Dockerfile
+    always resolves to the snapshot built from it last time and any edit to
+    it or to its COPY/ADD inputs resolves to a new one.
+    """
+
+    def __init__(self, daytona, on_logs=print):
+        self.daytona = daytona
+        self.on_logs = on_logs
+        self.stats = SnapshotStats()
+        self._resolved: set[str] = set()
+
+    def snapshot_name(self, dockerfile, extra_inputs=()) -> str:
+        return f"{SNAPSHOT_PREFIX}-{dockerfile_hash(dockerfile, extra_inputs)[:16]}"
+
+    def resolve(self, dockerfile, extra_inputs=()) -> str:
+        """Name of a ready snapshot for `dockerfile`, building it if needed"""
+        name = self.snapshot_name(dockerfile, extra_inputs)
+        if name in self._resolved:
+            self.stats.hits += 1
+            return name
+
+        with span("snapshot.resolve", snapshot=name) as resolve:
+            snapshot = self._get(name)
+            hit = snapshot is not None and _state(snapshot) not in FAILED_STATES
+            resolve.set(hit=hit)
+            if hit:
+                self.stats.hits += 1
+            else:
+                if snapshot is not None:
+                    self.daytona.snapshot.delete(snapshot)
+                self._build(name, dockerfile)
+        self._resolved.add(name)
+        return name
+
+    def _get(self, name):
+        from daytona import DaytonaError
+
+        try:
+            return self.daytona.snapshot.get(name)
+        except DaytonaError:
+            return None
+
+    def _build(self, name, dockerfile) -> None:
+        from daytona import CreateSnapshotParams, Image
+
+        self.stats.misses += 1
+        start = time.perf_counter()
+        image = Image.from_dockerfile(dockerfile)
+        with span("snapshot.build", snapshot=name):
+            self.daytona.snapshot.create(
+                CreateSnapshotParams(name=name, image=image), on_logs=self.on_logs
+            )
+        self.stats.build_seconds += time.perf_counter() - start
+
+
+def _state(snapshot) -> str:
+    return str(getattr(snapshot.state, "value", snapshot.state)).lower()
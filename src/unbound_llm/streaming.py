@@ -0,0 +1,303 @@
+"""Streaming a task's Claude events out of a sandbox while the agent runs"""
+
+import asyncio
+import json
+import re
+import shlex
+import time
+import uuid
+from dataclasses import dataclass
+
+from unbound_llm.scheduler import RATE_LIMIT_PATTERN
+from unbound_llm.tasks import CLAUDE_EXECUTABLE, DEFAULT_FLAGS, Task, claude_command
+from unbound_llm.tracing import span
+
+# Print mode only emits stream-json when --verbose is also set
+STREAM_FLAGS = ("--output-format", "stream-json", "--verbose")
+
+# Tail of stderr kept for error reporting; anything older is dropped
+STDERR_LIMIT = 64 * 1024
+
+# Events a TaskStream holds for a caller that has fallen behind
+MAX_QUEUED_EVENTS = 1000
+
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
+@dataclass
+class StreamMetrics:
+    time_to_first_event: float | None = None
+    duration: float = 0.0
+    events: int = 0
+    # Events dropped unread because the caller fell too far behind
+    dropped_events: int = 0
+    bytes: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cost_usd: float | None = None
+
+    @property
+    def tokens(self) -> int:
+        """Tokens counted against rate limits (cache reads are not)"""
+        return self.input_tokens + self.cache_creation_input_tokens + self.output_tokens
+
+    def add_result(self, event: dict) -> None:
+        """Take token usage and cost from the final `result` event"""
+        usage = event.get("usage") or {}
+        for name in USAGE_FIELDS:
+            setattr(self, name, int(usage.get(name) or 0))
+        self.cost_usd = event.get("total_cost_usd")
+
+
+class EventParser:
+    """Turns chunks of newline-delimited JSON into events.
+
+    The parser itself only holds the trailing incomplete line between chunks.
+    Lines that are not JSON objects come out as {"type": "raw", "line": ...}.
+    """
+
+    def __init__(self):
+        self._pending = ""
+
+    def feed(self, chunk: str) -> list[dict]:
+        lines = (self._pending + chunk).split("\n")
+        self._pending = lines.pop()
+        return [event for line in lines if (event := parse_event(line))]
+
+    def close(self) -> list[dict]:
+        line, self._pending = self._pending, ""
+        event = parse_event(line)
+        return [event] if event else []
+
+
+def parse_event(line: str) -> dict | None:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return {"type": "raw", "line": line}
+    return event if isinstance(event, dict) else {"type": "raw", "line": line}
+
+
+def skills_read(event: dict, skills_path=None) -> set[str]:
+    """Skills an assistant event invoked or read files from.
+
+    Counts the Skill tool and, with `skills_path`, any other tool call whose
+    input mentions a path inside it, such as a Read of a skill's SKILL.md or a
+    Bash run of one of its scripts.
+    """
+    if event.get("type") != "assistant":
+        return set()
+    pattern = None
+    if skills_path is not None:
+        root = re.escape(str(skills_path).rstrip("/"))
+        pattern = re.compile(root + r"/([^/\s\"']+)/")
+    names = set()
+    for block in (event.get("message") or {}).get("content") or []:
+        if not isinstance(block, dict) or block.get("type") != "tool_use":
+            continue
+        tool_input = block.get("input") or {}
+        if block.get("name") == "Skill":
+            name = tool_input.get("skill") or tool_input.get("command")
+            if name:
+                names.add(str(name))
+        if pattern is not None:
+            names.update(pattern.findall(json.dumps(tool_input)))
+    return names
+
+
+def summarize_stream(text: str, skills_path=None) -> tuple[str, list[str], dict | None]:
+    """The final answer, the skills read and the `result` event of a run.
+
+    Output that holds no `result` event (an old CLI, or a crash before the
+    end) is returned unchanged, with None for the event.
+    """
+    parser = EventParser()
+    result = None
+    names = set()
+    for event in [*parser.feed(text), *parser.close()]:
+        names |= skills_read(event, skills_path)
+        if event.get("type") == "result":
+            result = event
+    if result is None:
+        return text, sorted(names), None
+    return str(result.get("result", "")), sorted(names), result
+
+
+class TaskStream:
+    """Async iterator over the stream-json events of one task.
+
+    The Claude CLI runs as an async command in its own session and its stdout
+    is parsed as it arrives, so each event reaches the caller while the agent
+    is still working. Once iteration ends, `exit_code`, `result` (the final
+    `result` event, if any) and `metrics` are filled in; `skills_used` grows
+    as the agent reads skills. Running past the task's timeout, or closing the
+    stream early (which leaving its `async with` block does), deletes the
+    session and the command with it.
+
+    Events wait in a queue of up to `max_queued_events` until the caller
+    takes them. The SDK delivers logs through synchronous callbacks, so a slow
+    caller cannot hold back the sandbox's output; once the queue is full the
+    oldest unread event is dropped for each new one and counted in
+    `metrics.dropped_events`. The final `result` event is the newest, so it
+    is never the one dropped, and `result` and `metrics` are kept up to date
+    either way.
+    """
+
+    def __init__(
+        self,
+        sandbox,
+        task: Task,
+        flags=DEFAULT_FLAGS,
+        executable=CLAUDE_EXECUTABLE,
+        cwd=None,
+        skills_path=None,
+        max_queued_events: int = MAX_QUEUED_EVENTS,
+    ):
+        self.sandbox = sandbox
+        self.task = task
+        self.flags = flags
+        self.executable = executable
+        self.cwd = cwd
+        self.skills_path = skills_path
+        self.max_queued_events = max(max_queued_events, 1)
+        self.skills_used: set[str] = set()
+        self.exit_code: int | None = None
+        self.result: dict | None = None
+        self.stderr = ""
+        self.metrics = StreamMetrics()
+        self._iterator = None
+
+    def __aiter__(self):
+        if self._iterator is None:
+            self._iterator = self._events()
+        return self._iterator
+
+    async def __aenter__(self) -> "TaskStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._iterator is not None:
+            await self._iterator.aclose()
+
+    def command(self) -> str:
+        command = claude_command(
+            self.task.prompt, (*self.flags, *STREAM_FLAGS), self.executable
+        )
+        if self.cwd is None:
+            return command
+        return f"cd {shlex.quote(str(self.cwd))} && {command}"
+
+    async def _events(self):
+        # The run lives in its own task so its span is not left open in the
+        # caller's context between events. One slot beyond the events is kept
+        # for the None that ends the stream.
+        events = asyncio.Queue(self.max_queued_events + 1)
+        run = asyncio.ensure_future(self._run(events))
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            await run
+        finally:
+            if not run.done():
+                run.cancel()
+                await asyncio.gather(run, return_exceptions=True)
+
+    async def _run(self, events: asyncio.Queue) -> None:
+        from daytona import SessionExecuteRequest
+
+        process = self.sandbox.process
+        session_id = f"unbound-{uuid.uuid4().hex}"
+        parser = EventParser()
+        start = time.perf_counter()
+
+        def publish(found: list[dict]) -> None:
+            for event in found:
+                self._record(event, start)
+                if events.qsize() >= self.max_queued_events:
+                    events.get_nowait()
+                    self.metrics.dropped_events += 1
+                events.put_nowait(event)
+
+        def on_stdout(chunk: str) -> None:
+            self.metrics.bytes += len(chunk.encode("utf-8"))
+            publish(parser.feed(chunk))
+
+        def on_stderr(chunk: str) -> None:
+            self.stderr = (self.stderr + chunk)[-STDERR_LIMIT:]
+
+        try:
+            with span(
+                "task.stream", task_id=self.task.id, sandbox_id=self.sandbox.id
+            ) as stream_span:
+                await asyncio.to_thread(process.create_session, session_id)
+                try:
+                    response = await asyncio.to_thread(
+                        process.execute_session_command,
+                        session_id,
+                        SessionExecuteRequest(command=self.command(), run_async=True),
+                    )
+                    await asyncio.wait_for(
+                        process.get_session_command_logs_async(
+                            session_id, response.cmd_id, on_stdout, on_stderr
+                        ),
+                        self.task.timeout,
+                    )
+                    publish(parser.close())
+                    self.exit_code = await self._exit_code(session_id, response.cmd_id)
+                finally:
+                    self.metrics.duration = time.perf_counter() - start
+                    stream_span.set(
+                        exit_code=self.exit_code,
+                        events=self.metrics.events,
+                        dropped_events=self.metrics.dropped_events,
+                        bytes=self.metrics.bytes,
+                        time_to_first_event=self.metrics.time_to_first_event,
+                        input_tokens=self.metrics.input_tokens,
+                        output_tokens=self.metrics.output_tokens,
+                    )
+                    try:
+                        await asyncio.to_thread(process.delete_session, session_id)
+                    except Exception as e:
+                        print(f"Error deleting session {session_id}: {e}")
+        finally:
+            events.put_nowait(None)
+
+    @property
+    def rate_limited(self) -> bool:
+        if self.exit_code in (0, None) and not (self.result or {}).get("is_error"):
+            return False
+        text = f"{self.stderr}\n{(self.result or {}).get('result', '')}"
+        return RATE_LIMIT_PATTERN.search(text) is not None
+
+    def _record(self, event: dict, start: float) -> None:
+        if self.metrics.time_to_first_event is None:
+            self.metrics.time_to_first_event = time.perf_counter() - start
+        self.metrics.events += 1
+        self.skills_used |= skills_read(event, self.skills_path)
+        if event.get("type") == "result":
+            self.result = event
+            self.metrics.add_result(event)
+
+    async def _exit_code(self, session_id, cmd_id, attempts: int = 50) -> int | None:
+        # The log stream can close a moment before the exit code is recorded
+        for _ in range(attempts):
+            command = await asyncio.to_thread(
+                self.sandbox.process.get_session_command, session_id, cmd_id
+            )
+            if command.exit_code is not None:
+                return command.exit_code
+            await asyncio.sleep(0.1)
+        return None
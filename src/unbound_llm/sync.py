@@ -0,0 +1,234 @@
+"""Sync a local directory into a sandbox in one upload and one exec"""
+
+import io
+import os
+import posixpath
+import shlex
+import tarfile
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from unbound_llm.manifest import (
+    MANIFEST_NAME,
+    build_manifest,
+    diff_manifests,
+    dump_manifest,
+    load_manifest,
+)
+from unbound_llm.tracing import span
+from unbound_llm.upload import DEFAULT_MAX_IN_FLIGHT_BYTES, upload_paths
+
+# Files at least this large skip the archive and are streamed to their path
+LARGE_FILE_THRESHOLD = 8 * 1024 * 1024
+
+
+@dataclass
+class SyncResult:
+    """What a sync transferred and how long each phase took"""
+
+    files: int
+    archive_bytes: int
+    pack_seconds: float
+    upload_seconds: float
+    unpack_seconds: float
+    files_deleted: int = 0
+    manifest_seconds: float = 0.0
+    streamed_bytes: int = 0
+
+    @property
+    def total_seconds(self) -> float:
+        return (
+            self.manifest_seconds
+            + self.pack_seconds
+            + self.upload_seconds
+            + self.unpack_seconds
+        )
+
+
+def pack_directory(
+    local_path, relative_paths=None, extra=None, arcnames=None
+) -> tuple[Path, int]:
+    """Pack files under `local_path` into a gzipped tarball in a temp file.
+
+    Entries are stored relative to `local_path`, or under the name `arcnames`
+    maps them to. Pass `relative_paths` to pack only those files; otherwise
+    every file in the tree is packed. `extra` maps
+    archive names to bytes that are added as generated files. File contents
+    are copied through in chunks, so memory use does not depend on file size.
+    Returns the archive path, which the caller deletes, and the number of
+    files taken from disk.
+    """
+    local_path = Path(local_path)
+    if relative_paths is None:
+        relative_paths = sorted(
+            item.relative_to(local_path).as_posix()
+            for item in local_path.rglob("*")
+            if item.is_file()
+        )
+
+    fd, archive = tempfile.mkstemp(prefix="unbound-", suffix=".tar.gz")
+    count = 0
+    with os.fdopen(fd, "wb") as f, tarfile.open(fileobj=f, mode="w:gz") as tar:
+        for relative_path in relative_paths:
+            arcname = (arcnames or {}).get(relative_path, relative_path)
+            tar.add(local_path / relative_path, arcname=arcname, recursive=False)
+            count += 1
+        for name, data in (extra or {}).items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(data))
+    return Path(archive), count
+
+
+def read_remote_manifest(sandbox, remote_path) -> dict:
+    """Fetch the manifest left by the last sync, or {} if there is none"""
+    manifest_path = shlex.quote(f"{remote_path}/{MANIFEST_NAME}")
+    response = sandbox.process.exec(f"cat {manifest_path} 2>/dev/null")
+    if response.exit_code != 0:
+        return {}
+    return load_manifest(response.result)
+
+
+def sync_directory(
+    sandbox,
+    local_path,
+    remote_path,
+    incremental=False,
+    large_file_threshold: int = LARGE_FILE_THRESHOLD,
+    max_in_flight_bytes: int = DEFAULT_MAX_IN_FLIGHT_BYTES,
+) -> SyncResult:
+    """Copy a local directory to `remote_path` inside the sandbox.
+
+    The tree is packed into one archive, sent with a single upload and
+    unpacked with a single exec, so the number of round trips does not grow
+    with the number of files. A manifest of every file's size and SHA-256 is
+    written alongside the files.
+
+    With `incremental=True` that manifest is read back first and only added or
+    changed files are uploaded; files that no longer exist locally are deleted
+    in the same exec. When nothing changed, the manifest read is the only
+    round trip.
+
+    Files of `large_file_threshold` bytes or more are left out of the archive
+    and streamed from disk straight to their destination, in uploads capped at
+    `max_in_flight_bytes`, so memory stays bounded whatever the tree holds.
+    """
+    with span("sync", remote_path=str(remote_path), incremental=incremental) as sync:
+        result = _sync_directory(
+            sandbox,
+            Path(local_path),
+            remote_path,
+            incremental,
+            large_file_threshold,
+            max_in_flight_bytes,
+        )
+        sync.set(
+            files=result.files,
+            files_deleted=result.files_deleted,
+            bytes=result.archive_bytes + result.streamed_bytes,
+        )
+    return result
+
+
+def _sync_directory(
+    sandbox,
+    local_path: Path,
+    remote_path,
+    incremental,
+    large_file_threshold,
+    max_in_flight_bytes,
+) -> SyncResult:
+    start = time.perf_counter()
+    with span("sync.manifest"):
+        local_manifest = build_manifest(local_path)
+        remote_manifest = {}
+        if incremental:
+            remote_manifest = read_remote_manifest(sandbox, remote_path)
+        diff = diff_manifests(remote_manifest, local_manifest)
+    compared = time.perf_counter()
+
+    if incremental and not diff:
+        return SyncResult(
+            files=0,
+            archive_bytes=0,
+            pack_seconds=0.0,
+            upload_seconds=0.0,
+            unpack_seconds=0.0,
+            manifest_seconds=compared - start,
+        )
+
+    small, large = [], []
+    for relative_path in diff.changed:
+        size = local_manifest[relative_path]["size"]
+        (large if size >= large_file_threshold else small).append(relative_path)
+
+    with span("sync.pack", files=len(small)):
+        archive, files = pack_directory(
+            local_path, small, extra={MANIFEST_NAME: dump_manifest(local_manifest)}
+        )
+    try:
+        archive_bytes = archive.stat().st_size
+        packed = time.perf_counter()
+
+        remote_archive = f"/tmp/unbound-sync-{uuid.uuid4().hex}.tar.gz"
+        uploads = [(archive, remote_archive)]
+        uploads += [
+            (local_path / relative_path, f"{remote_path}/{relative_path}")
+            for relative_path in large
+        ]
+        streamed_bytes = (
+            upload_paths(sandbox, uploads, max_in_flight_bytes) - archive_bytes
+        )
+        uploaded = time.perf_counter()
+    finally:
+        archive.unlink()
+
+    command = unpack_command(remote_archive, remote_path)
+    if diff.removed:
+        command = f"{remove_command(remote_path, diff.removed)} && {command}"
+    with span("sync.unpack", files_deleted=len(diff.removed)):
+        response = sandbox.process.exec(command)
+    if response.exit_code != 0:
+        raise RuntimeError(f"Error unpacking into {remote_path}: {response.result}")
+    unpacked = time.perf_counter()
+
+    return SyncResult(
+        files=files + len(large),
+        archive_bytes=archive_bytes,
+        pack_seconds=packed - compared,
+        upload_seconds=uploaded - packed,
+        unpack_seconds=unpacked - uploaded,
+        files_deleted=len(diff.removed),
+        manifest_seconds=compared - start,
+        streamed_bytes=streamed_bytes,
+    )
+
+
+def unpack_command(remote_archive, remote_path) -> str:
+    """Shell command that unpacks an uploaded archive and then removes it"""
+    archive = shlex.quote(remote_archive)
+    target = shlex.quote(str(remote_path))
+    return (
+        f"mkdir -p {target} && tar -xzf {archive} -C {target}; "
+        f"status=$?; rm -f {archive}; exit $status"
+    )
+
+
+def remove_command(remote_path, relative_paths) -> str:
+    """Shell command that deletes files under `remote_path`.
+
+    Directories the deletes left empty are removed up to `remote_path`; other
+    empty directories are left alone.
+    """
+    target = shlex.quote(str(remote_path))
+    paths = " ".join(shlex.quote(path) for path in relative_paths)
+    parents = {posixpath.dirname(path) for path in relative_paths} - {""}
+    command = f"cd {target} 2>/dev/null && rm -f -- {paths}"
+    if parents:
+        directories = " ".join(shlex.quote(path) for path in sorted(parents))
+        command += f" && {{ rmdir -p -- {directories} 2>/dev/null; true; }}"
+    return f"({command}; true)"
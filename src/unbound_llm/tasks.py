@@ -0,0 +1,183 @@
+"""Claude prompts as tasks, and running one inside a sandbox"""
+
+import json
+import math
+import shlex
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from unbound_llm.manifest import (
+    diff_manifests,
+    fill_hashes,
+    remote_manifest_command,
+)
+from unbound_llm.tracing import span
+
+CLAUDE_EXECUTABLE = "claude"
+DEFAULT_FLAGS = ("--dangerously-skip-permissions",)
+
+
+@dataclass
+class Task:
+    """One prompt, optionally ordered after the tasks listed in `depends_on`.
+
+    A scheduler admits higher `priority` tasks first.
+    """
+
+    id: str
+    prompt: str
+    depends_on: list[str] = field(default_factory=list)
+    timeout: float | None = None
+    priority: int = 0
+
+
+@dataclass
+class SkillsDelta:
+    """Skill names (top-level directories) that a task added, changed or removed"""
+
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+@dataclass
+class TaskResult:
+    task_id: str
+    exit_code: int
+    output: str
+    duration: float
+    attempts: int = 1
+    error: str | None = None
+    cached: bool = False
+    skills_delta: SkillsDelta | None = None
+    # Skills the task invoked or read from, when usage is tracked
+    skills_used: list[str] = field(default_factory=list)
+    # File manifest of the skills directory right after the task, with mtimes
+    skills: dict | None = field(default=None, repr=False)
+    # API usage the run reported, when its output carries it (stream-json or
+    # an agent session): rate-limited tokens and turns (one request each)
+    tokens: int | None = None
+    turns: int | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.exit_code == 0
+
+    @property
+    def skill_names(self) -> list[str]:
+        return skill_names(self.skills or {})
+
+
+def claude_command(prompt, flags=DEFAULT_FLAGS, executable=CLAUDE_EXECUTABLE) -> str:
+    """Shell command that runs `prompt` through the Claude CLI in print mode"""
+    return shlex.join([executable, *flags, "-p", prompt])
+
+
+def skill_names(manifest: dict) -> list[str]:
+    """Top-level directories in `manifest`; hidden ones and batches are never skills"""
+    return sorted(
+        {
+            path.split("/", 1)[0]
+            for path, entry in manifest.items()
+            if "/" in path and not path.startswith(".") and not entry.get("batch")
+        }
+    )
+
+
+def skills_delta(before: dict, after: dict) -> SkillsDelta:
+    """Roll a file-level manifest diff up to the skills it touched"""
+    diff = diff_manifests(before, after)
+    before_names = set(skill_names(before))
+    after_names = set(skill_names(after))
+    touched = {path.split("/", 1)[0] for path in diff.changed + diff.removed}
+    return SkillsDelta(
+        added=sorted(after_names - before_names),
+        changed=sorted((touched & before_names) & after_names),
+        removed=sorted(before_names - after_names),
+    )
+
+
+def task_command(task: Task, flags, executable, skills_path, marker, known=None) -> str:
+    """Claude run followed by a skills snapshot, keeping Claude's exit code"""
+    return snapshot_command(
+        claude_command(task.prompt, flags, executable), skills_path, marker, known
+    )
+
+
+def snapshot_command(command: str, skills_path, marker, known=None) -> str:
+    """`command` followed by a skills snapshot, keeping its exit code.
+
+    Files whose size and mtime match `known` are not hashed again; pass the
+    same `known` to `split_skills_snapshot`.
+    """
+    return (
+        f"{command}; status=$?; "
+        f"printf '\\n%s\\n' {marker}; "
+        f"{remote_manifest_command(skills_path, known)}; exit $status"
+    )
+
+
+def run_task(
+    sandbox,
+    task: Task,
+    flags=DEFAULT_FLAGS,
+    executable=CLAUDE_EXECUTABLE,
+    cwd=None,
+    skills_path=None,
+    skills_before: dict | None = None,
+) -> TaskResult:
+    """Run one task with a single blocking exec and time it.
+
+    With `skills_path` set, the same exec also hashes the skills directory
+    once Claude exits, so the result carries the skills snapshot and, against
+    `skills_before`, the skills delta without another round trip. Only files
+    that differ in size or mtime from `skills_before` are read.
+    """
+    timeout = math.ceil(task.timeout) if task.timeout else None
+    marker = f"__unbound_skills_{uuid.uuid4().hex}__"
+    if skills_path is None:
+        command = claude_command(task.prompt, flags, executable)
+    else:
+        command = task_command(
+            task, flags, executable, skills_path, marker, skills_before
+        )
+
+    start = time.perf_counter()
+    with span("task.exec", task_id=task.id, sandbox_id=sandbox.id) as exec_span:
+        response = sandbox.process.exec(command, cwd=cwd, timeout=timeout)
+        exec_span.set(
+            exit_code=response.exit_code,
+            bytes=len(response.result.encode("utf-8")),
+        )
+    duration = time.perf_counter() - start
+
+    output, skills = split_skills_snapshot(response.result, marker, skills_before)
+    delta = None
+    if skills is not None:
+        delta = skills_delta(skills_before or {}, skills)
+    return TaskResult(
+        task_id=task.id,
+        exit_code=response.exit_code,
+        output=output,
+        duration=duration,
+        skills_delta=delta,
+        skills=skills,
+    )
+
+
+def split_skills_snapshot(
+    result: str, marker: str, known: dict | None = None
+) -> tuple[str, dict | None]:
+    """Separate Claude's output from the snapshot printed after `marker`"""
+    output, found, snapshot = result.rpartition(f"\n{marker}\n")
+    if not found:
+        return result, None
+    try:
+        skills = json.loads(snapshot)
+    except ValueError:
+        return output, None
+    return output, fill_hashes(skills, known)
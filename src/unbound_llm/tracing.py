@@ -0,0 +1,154 @@
+"""Lightweight spans for where a run's wall time goes, exportable as JSON or OTLP"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "unbound_current_span", default=None
+)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds between start and end, or so far if still open"""
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e9
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+
+class Tracer:
+    """Collects finished spans in memory, keeping at most `max_spans`.
+
+    Spans nest through a context variable, so a span opened inside another
+    one, in the same thread or asyncio task, becomes its child. Code that hops
+    to a worker thread should carry the context across with
+    `contextvars.copy_context().run`.
+    """
+
+    def __init__(self, max_spans: int = 100_000, service_name: str = "unbound-llm"):
+        self.service_name = service_name
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent else None,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            with self._lock:
+                self.spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def records(self) -> list[dict]:
+        """Finished spans as plain dicts, with `duration` in seconds"""
+        with self._lock:
+            spans = list(self.spans)
+        return [{**asdict(span), "duration": span.duration} for span in spans]
+
+    def otlp(self) -> dict:
+        """Finished spans in the OTLP/JSON `ExportTraceServiceRequest` shape"""
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {"service.name": self.service_name}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "unbound_llm"},
+                            "spans": [_otlp_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def export(self, path, format: str = "json") -> None:
+        """Write spans to `path` as JSON lines ("json") or OTLP/JSON ("otlp")"""
+        with open(path, "w", encoding="utf-8") as f:
+            if format == "otlp":
+                json.dump(self.otlp(), f)
+            else:
+                for record in self.records():
+                    f.write(json.dumps(record, default=str) + "\n")
+
+
+def _otlp_span(span: Span) -> dict:
+    record = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        record["parentSpanId"] = span.parent_id
+    return record
+
+
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    values = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            wrapped = {"boolValue": value}
+        elif isinstance(value, int):
+            wrapped = {"intValue": str(value)}
+        elif isinstance(value, float):
+            wrapped = {"doubleValue": value}
+        else:
+            wrapped = {"stringValue": str(value)}
+        values.append({"key": key, "value": wrapped})
+    return values
+
+
+# Process-wide tracer used by the rest of the package
+tracer = Tracer()
+
+
+def span(name: str, **attributes):
+    """Open a span on the process-wide tracer"""
+    return tracer.span(name, **attributes)
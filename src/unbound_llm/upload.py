@@ -0,0 +1,57 @@
+"""Stream files from disk into a sandbox with a cap on bytes in flight"""
+
+import os
+from pathlib import Path
+
+from unbound_llm.tracing import span
+
+# Upper bound on the bytes of file content a single upload call carries
+DEFAULT_MAX_IN_FLIGHT_BYTES = 64 * 1024 * 1024
+
+
+def upload_paths(
+    sandbox, uploads, max_in_flight_bytes: int = DEFAULT_MAX_IN_FLIGHT_BYTES
+) -> int:
+    """Upload `(local_path, remote_path)` pairs, streaming each file from disk.
+
+    Files are passed to the SDK by path rather than read into memory, and are
+    grouped into `upload_files` calls whose combined size stays under
+    `max_in_flight_bytes`; a file larger than the cap goes in a call of its
+    own. Returns the number of bytes uploaded.
+    """
+    from daytona import FileUpload
+
+    def send(batch, batch_bytes):
+        with span("upload", files=len(batch), bytes=batch_bytes):
+            sandbox.fs.upload_files(batch)
+
+    batch = []
+    batch_bytes = 0
+    total = 0
+    for local_path, remote_path in uploads:
+        size = os.path.getsize(local_path)
+        if batch and batch_bytes + size > max_in_flight_bytes:
+            send(batch, batch_bytes)
+            batch, batch_bytes = [], 0
+        batch.append(FileUpload(source=str(local_path), destination=str(remote_path)))
+        batch_bytes += size
+        total += size
+    if batch:
+        send(batch, batch_bytes)
+    return total
+
+
+def upload_tree(
+    sandbox,
+    local_path,
+    remote_path,
+    max_in_flight_bytes: int = DEFAULT_MAX_IN_FLIGHT_BYTES,
+) -> int:
+    """Upload every file under `local_path` to the same layout at `remote_path`"""
+    local_path = Path(local_path)
+    uploads = (
+        (item, f"{remote_path}/{item.relative_to(local_path).as_posix()}")
+        for item in sorted(local_path.rglob("*"))
+        if item.is_file()
+    )
+    return upload_paths(sandbox, uploads, max_in_flight_bytes)
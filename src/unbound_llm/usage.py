@@ -0,0 +1,170 @@
+"""Which skills tasks actually read, and pruning the ones nobody reads"""
+
+import shlex
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+
+from unbound_llm.harvest import HARVEST_ARCHIVE, pull_files
+from unbound_llm.tracing import span
+
+# Always kept, however cold: the skill that writes the other skills
+PINNED_SKILLS = ("skill-creator",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS skills (
+    name TEXT PRIMARY KEY,
+    first_seen REAL NOT NULL,
+    last_used REAL,
+    uses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+@dataclass
+class PrunePlan:
+    """Skills to evict, and why each one was picked"""
+
+    evict: dict[str, str] = field(default_factory=dict)
+    kept: list[str] = field(default_factory=list)
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+
+class SkillUsage:
+    """SQLite record of when each skill was first seen and last read.
+
+    A skill that has never been read ages from when it was first seen, so a
+    freshly created skill is not cold straight away.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def seen(self, names, when: float | None = None) -> None:
+        """Register skills found on the volume, keeping earlier sightings"""
+        when = time.time() if when is None else when
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO skills (name, first_seen) VALUES (?, ?)",
+                [(name, when) for name in names],
+            )
+
+    def record(self, names, when: float | None = None) -> None:
+        """Count one use of each skill in `names`"""
+        when = time.time() if when is None else when
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO skills (name, first_seen, last_used, uses) "
+                "VALUES (?, ?, ?, 1) ON CONFLICT (name) DO UPDATE SET "
+                "last_used = excluded.last_used, uses = uses + 1",
+                [(name, when, when) for name in names],
+            )
+
+    def forget(self, names) -> None:
+        with self._lock, self._db:
+            self._db.executemany(
+                "DELETE FROM skills WHERE name = ?", [(name,) for name in names]
+            )
+
+    def last_active(self) -> dict[str, float]:
+        """Each known skill's last use, or first sighting if never used"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name, COALESCE(last_used, first_seen) FROM skills"
+            ).fetchall()
+        return dict(rows)
+
+    def stats(self) -> list[tuple[str, int, float | None]]:
+        """(name, uses, last_used) for every known skill, most used first"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT name, uses, last_used FROM skills ORDER BY uses DESC, name"
+            ).fetchall()
+
+
+def skill_sizes(manifest: dict) -> dict[str, int]:
+    """Total bytes per skill (top-level directory) in a skills manifest.
+
+    Like `skill_names`, hidden directories and batches are not skills, so
+    pruning never picks them.
+    """
+    sizes = {}
+    for path, entry in manifest.items():
+        if "/" in path and not path.startswith(".") and not entry.get("batch"):
+            name = path.split("/", 1)[0]
+            sizes[name] = sizes.get(name, 0) + entry["size"]
+    return sizes
+
+
+def plan_prune(
+    manifest: dict,
+    usage: SkillUsage,
+    max_age: float | None = None,
+    max_skills: int | None = None,
+    max_bytes: int | None = None,
+    pinned=PINNED_SKILLS,
+    now: float | None = None,
+) -> PrunePlan:
+    """Pick the skills to evict from the tree described by `manifest`.
+
+    First every skill idle for more than `max_age` seconds goes, then the
+    least recently active until at most `max_skills` skills and `max_bytes`
+    bytes remain. Pinned skills are never picked, even if that leaves the
+    tree over budget. Skills missing from `usage` count as active `now`; the
+    plan is read-only, so register them with `usage.seen` to start their clock.
+    """
+    now = time.time() if now is None else now
+    sizes = skill_sizes(manifest)
+    last_active = usage.last_active()
+    plan = PrunePlan(bytes_before=sum(sizes.values()))
+
+    remaining = dict(sizes)
+    candidates = sorted(
+        (name for name in sizes if name not in pinned),
+        key=lambda name: last_active.get(name, now),
+    )
+    for name in candidates:
+        if max_age is not None and now - last_active.get(name, now) > max_age:
+            days = (now - last_active[name]) / 86400
+            plan.evict[name] = f"idle {days:.1f} days"
+        elif max_skills is not None and len(remaining) > max_skills:
+            plan.evict[name] = f"over {max_skills} skills"
+        elif max_bytes is not None and sum(remaining.values()) > max_bytes:
+            plan.evict[name] = f"over {max_bytes} bytes"
+        else:
+            continue
+        del remaining[name]
+
+    plan.kept = sorted(remaining)
+    plan.bytes_after = sum(remaining.values())
+    return plan
+
+
+def prune_skills(
+    sandbox, remote_path, names, archive_to=None, archive_path=HARVEST_ARCHIVE
+) -> None:
+    """Delete skill directories from `remote_path`, archiving them locally first.
+
+    With `archive_to`, the skills are packed into one archive at
+    `archive_path` in the sandbox and unpacked under that local directory
+    before anything is deleted.
+    """
+    names = sorted(names)
+    if not names:
+        return
+    with span("skills.prune", skills=len(names)):
+        if archive_to is not None:
+            pull_files(sandbox, remote_path, names, archive_to, archive_path)
+        paths = " ".join(
+            shlex.quote(f"{str(remote_path).rstrip('/')}/{name}") for name in names
+        )
+        response = sandbox.process.exec(f"rm -rf -- {paths}")
+        if response.exit_code != 0:
+            raise RuntimeError(f"Error pruning skills: {response.result}")
@@ -0,0 +1,41 @@
+import pytest
+
+from unbound_llm.backend import LocalBackend
+from unbound_llm.local import LocalSandbox
+from unbound_llm.pool import SandboxPool
+
+# Stands in for the Claude CLI: runs its prompt (the last argument) as a shell
+# snippet in the task's working directory, the sandbox workspace
+FAKE_CLAUDE = """#!/bin/sh
+for prompt; do :; done
+eval "$prompt"
+"""
+
+# The sandbox skills directory, relative to the workspace
+SKILLS = "../root/.claude/skills"
+
+
+@pytest.fixture
+def backend():
+    return LocalBackend()
+
+
+@pytest.fixture
+def sandbox():
+    sandbox = LocalSandbox()
+    yield sandbox
+    sandbox.delete()
+
+
+@pytest.fixture
+def pool(backend):
+    with SandboxPool(backend, size=1) as pool:
+        yield pool
+
+
+@pytest.fixture
+def claude(tmp_path):
+    path = tmp_path / "claude"
+    path.write_text(FAKE_CLAUDE)
+    path.chmod(0o755)
+    return str(path)
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+
+from unbound_llm.batch import BatchWriter
+from unbound_llm.harvest import read_sandbox_manifest
+from unbound_llm.tasks import skill_names
+from unbound_llm.usage import SkillUsage, plan_prune
+
+
+def test_commit_swaps_in_exactly_the_new_files(sandbox, tmp_path):
+    skills = Path(sandbox.root) / "skills"
+    target = skills / "samples"
+    target.mkdir(parents=True)
+    (skills / "greet").mkdir()
+    (skills / "greet" / "SKILL.md").write_text("Say hello")
+    (target / "stale.txt").write_text("from before batching")
+
+    data = {"numbers": [1, 2]}
+    with BatchWriter(sandbox, target, staging_path=str(sandbox.root)) as batch:
+        batch.add("notes.txt", "Hello")
+        batch.add_json("data.json", data)
+        # JSON is serialized at commit time
+        data["numbers"].append(3)
+    assert target.is_symlink()
+    assert sorted(p.name for p in target.iterdir()) == ["data.json", "notes.txt"]
+    assert (target / "data.json").read_text().count("3") == 1
+
+    batch = BatchWriter(sandbox, target, staging_path=str(sandbox.root))
+    batch.add("other/notes.txt", "Bye")
+    result = batch.commit()
+    assert result.files == 1
+    assert [p.name for p in target.iterdir()] == ["other"]
+    # Only the live version is left next to the link. Manifests see the
+    # batch under its own name, but it is neither a skill nor prunable
+    assert len(list(skills.iterdir())) == 3
+    manifest = read_sandbox_manifest(sandbox, str(skills))
+    assert manifest["samples/other/notes.txt"]["batch"]
+    assert "batch" not in manifest["greet/SKILL.md"]
+    assert skill_names(manifest) == ["greet"]
+    usage = SkillUsage(tmp_path / "usage.db")
+    try:
+        plan = plan_prune(manifest, usage, max_skills=0, pinned=set())
+    finally:
+        usage.close()
+    assert list(plan.evict) == ["greet"]
+    assert not list(Path(sandbox.root).glob("*.tar.gz"))
+
+
+def test_batch_is_not_committed_when_block_raises(sandbox):
+    target = Path(sandbox.root) / "samples"
+    batch = BatchWriter(sandbox, target, staging_path=str(sandbox.root))
+    with pytest.raises(RuntimeError), batch:
+        batch.add("notes.txt", "Hello")
+        raise RuntimeError("stop")
+    assert not target.exists()
+
+
+def test_paths_must_stay_inside_batch(sandbox):
+    batch = BatchWriter(sandbox, Path(sandbox.root) / "samples")
+    for path in ["/etc/passwd", "../escape", "a/../../escape", "."]:
+        with pytest.raises(ValueError):
+            batch.add(path, "x")
@@ -0,0 +1,70 @@
+import hashlib
+from pathlib import Path
+
+from unbound_llm.blobstore import blob_path, list_blobs, publish_tree
+from unbound_llm.manifest import MANIFEST_NAME, STORE_NAME
+
+
+def published_files(root: Path) -> dict[str, str]:
+    return {
+        str(path.relative_to(root)): path.read_text()
+        for path in root.rglob("*")
+        if path.is_file()
+        and path.name != MANIFEST_NAME
+        and STORE_NAME not in path.relative_to(root).parts
+    }
+
+
+def digests(*contents: bytes) -> set[str]:
+    return {hashlib.sha256(content).hexdigest() for content in contents}
+
+
+def test_republish_uploads_only_new_blobs(sandbox, tmp_path):
+    local = tmp_path / "skills"
+    (local / "greet").mkdir(parents=True)
+    (local / "greet" / "SKILL.md").write_text("Say hello")
+    (local / "greet" / "copy.md").write_text("Say hello")
+    (local / "old" / "nested").mkdir(parents=True)
+    (local / "old" / "nested" / "notes.txt").write_text("old")
+    roots = [Path(sandbox.root) / "volume-a", Path(sandbox.root) / "volume-b"]
+    staging = str(Path(sandbox.root) / "staging")
+
+    first = publish_tree(sandbox, local, roots, staging_path=staging)
+    assert (first.files, first.blobs, first.blobs_uploaded) == (3, 2, 2)
+    expected = {"greet/SKILL.md": "Say hello", "greet/copy.md": "Say hello"}
+    expected["old/nested/notes.txt"] = "old"
+    for root in roots:
+        assert published_files(root) == expected
+    stored = list_blobs(sandbox, map(str, roots))
+    assert stored == {str(root): digests(b"Say hello", b"old") for root in roots}
+
+    # Tree files are hard links to their blob, not copies of it
+    digest = hashlib.sha256(b"Say hello").hexdigest()
+    for root in roots:
+        blob = root / STORE_NAME / blob_path(digest)
+        assert (root / "greet" / "copy.md").stat().st_ino == blob.stat().st_ino
+
+    again = publish_tree(sandbox, local, roots, staging_path=staging)
+    assert again.tree == first.tree
+    assert again.blobs_uploaded == 0
+
+    for root in roots:
+        (root / "unrelated").mkdir()
+    (local / "old" / "nested" / "notes.txt").unlink()
+    (local / "old" / "nested").rmdir()
+    (local / "old").rmdir()
+    (local / "greet" / "SKILL.md").write_text("Say hi")
+    changed = publish_tree(sandbox, local, roots, staging_path=staging)
+    assert changed.tree != first.tree
+    assert changed.blobs_uploaded == 1
+    expected = {"greet/SKILL.md": "Say hi", "greet/copy.md": "Say hello"}
+    for root in roots:
+        assert published_files(root) == expected
+        # Emptied parents of removed files go; other empty directories stay
+        assert not (root / "old").exists()
+        assert (root / "unrelated").is_dir()
+    # The store is append-only: earlier blobs stay alongside the new one
+    stored = list_blobs(sandbox, map(str, roots))
+    everything = digests(b"Say hello", b"old", b"Say hi")
+    assert stored == {str(root): everything for root in roots}
+    assert not list(Path(sandbox.root).glob("staging*"))
@@ -0,0 +1,54 @@
+import asyncio
+from pathlib import Path
+
+from conftest import SKILLS
+
+from unbound_llm.cache import ResultCache
+from unbound_llm.executor import TaskExecutor
+from unbound_llm.tasks import Task
+
+# Idempotent, so rerunning it leaves the skills tree as it found it
+ADD_SKILL = (
+    f"mkdir -p {SKILLS}/notes && echo 'Take notes' > {SKILLS}/notes/SKILL.md"
+    " && echo done"
+)
+
+
+def run_one(executor, task):
+    async def collect():
+        return [result async for result in executor.run([task])]
+
+    [result] = asyncio.run(collect())
+    assert result.ok
+    return result
+
+
+def test_skills_changes_between_runs_miss_the_cache(pool, claude, tmp_path):
+    cache = ResultCache(tmp_path / "cache.db")
+    executor = TaskExecutor(pool, flags=(), executable=claude, cache=cache)
+
+    first = run_one(executor, Task("1", ADD_SKILL))
+    assert not first.cached
+    assert first.skills_delta.added == ["notes"]
+
+    # The first run added a skill, so the same prompt now runs against a
+    # different tree
+    assert not run_one(executor, Task("2", ADD_SKILL)).cached
+    assert run_one(executor, Task("3", ADD_SKILL)).cached
+
+    # So does a change made to the tree outside any task
+    with pool.lease() as sandbox:
+        skills = Path(pool.backend.resolve(sandbox, executor.skills_path))
+        (skills / "notes" / "SKILL.md").write_text("Take fewer notes")
+    assert not run_one(executor, Task("4", ADD_SKILL)).cached
+    assert (cache.hits, cache.misses) == (1, 3)
+    cache.close()
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = ResultCache(tmp_path / "cache.db", ttl=0.0)
+    key = cache.key("prompt", (), "skills")
+    cache.put(key, "skills", "output")
+    assert cache.get(key) is None
+    assert cache.misses == 1
+    cache.close()
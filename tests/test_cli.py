@@ -0,0 +1,9 @@
+import pytest
+
+from unbound_llm.cli import main
+
+
+def test_keep_context_requires_session(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        main(["run", str(tmp_path / "tasks.jsonl"), "--local", "--keep-context"])
+    assert "--keep-context requires --session" in capsys.readouterr().err
@@ -0,0 +1,54 @@
+import asyncio
+
+from unbound_llm.executor import TaskExecutor
+from unbound_llm.pool import SandboxPool
+from unbound_llm.tasks import Task
+
+
+def run(executor, tasks, completed=()):
+    async def collect():
+        return [result async for result in executor.run(tasks, completed)]
+
+    return {result.task_id: result for result in asyncio.run(collect())}
+
+
+def executor_for(pool, claude, **kwargs):
+    return TaskExecutor(
+        pool, flags=(), executable=claude, skills_path=None, retry_delay=0, **kwargs
+    )
+
+
+def test_tasks_wait_for_their_dependencies(backend, claude, tmp_path):
+    log = tmp_path / "log"
+    tasks = [
+        Task("b", f"echo b >> {log}", depends_on=["a"]),
+        Task("a", f"sleep 0.2; echo a >> {log}"),
+        Task("c", f"echo c >> {log}", depends_on=["a", "b"]),
+    ]
+    with SandboxPool(backend, size=2) as pool:
+        results = run(executor_for(pool, claude), tasks)
+    assert all(result.ok for result in results.values())
+    assert log.read_text().split() == ["a", "b", "c"]
+
+
+def test_failure_propagates_to_dependents(pool, claude):
+    tasks = [
+        Task("a", "exit 3"),
+        Task("b", "echo b", depends_on=["a"]),
+        Task("c", "echo c", depends_on=["b"]),
+        Task("d", "echo d"),
+        Task("e", "echo e", depends_on=["missing"]),
+    ]
+    results = run(executor_for(pool, claude, retries=0), tasks)
+    assert results["a"].exit_code == 3
+    assert "Dependency failed" in results["b"].error
+    assert "Dependency failed" in results["c"].error
+    assert results["d"].ok and results["d"].output.strip() == "d"
+    assert not results["e"].ok
+
+
+def test_completed_ids_satisfy_dependencies(pool, claude):
+    results = run(
+        executor_for(pool, claude), [Task("b", "echo b", depends_on=["a"])], {"a"}
+    )
+    assert results["b"].ok
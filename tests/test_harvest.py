@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from unbound_llm.harvest import harvest_skills
+from unbound_llm.manifest import build_manifest
+from unbound_llm.pool import SandboxPool
+
+
+def make_skills(root: Path) -> Path:
+    (root / "greet").mkdir(parents=True)
+    (root / "greet" / "SKILL.md").write_text("Say hello")
+    (root / "shout").mkdir()
+    (root / "shout" / "SKILL.md").write_text("SAY HELLO")
+    return root
+
+
+def test_only_added_and_changed_files_come_back(sandbox, tmp_path):
+    baseline = make_skills(tmp_path / "baseline")
+    remote = make_skills(Path(sandbox.root) / "skills")
+    (remote / "greet" / "SKILL.md").write_text("Say hi")
+    (remote / "notes").mkdir()
+    (remote / "notes" / "SKILL.md").write_text("Take notes")
+    (remote / "shout" / "SKILL.md").unlink()
+
+    store = make_skills(tmp_path / "store")
+    archive = str(Path(sandbox.root) / "harvest.tar.gz")
+    result = harvest_skills(
+        sandbox, build_manifest(baseline), store, remote, archive_path=archive
+    )
+    assert sorted(result.files) == ["greet/SKILL.md", "notes/SKILL.md"]
+    assert (store / "greet" / "SKILL.md").read_text() == "Say hi"
+    assert (store / "notes" / "SKILL.md").read_text() == "Take notes"
+    # Deleting a file in the sandbox never deletes it from the store
+    assert (store / "shout" / "SKILL.md").read_text() == "SAY HELLO"
+
+    again = harvest_skills(
+        sandbox, build_manifest(store), store, remote, archive_path=archive
+    )
+    assert again.files == []
+
+
+def test_pool_harvests_on_release(backend, tmp_path):
+    store = make_skills(tmp_path / "store")
+    with SandboxPool(backend, size=1, baseline=store, harvest_to=store) as pool:
+        with pool.lease() as sandbox:
+            skills = Path(backend.resolve(sandbox, pool.baseline_path))
+            (skills / "notes").mkdir()
+            (skills / "notes" / "SKILL.md").write_text("Take notes")
+        assert (store / "notes" / "SKILL.md").read_text() == "Take notes"
+        # The sandbox itself goes back to the baseline it was created with
+        assert not (skills / "notes").exists()
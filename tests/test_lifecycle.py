@@ -0,0 +1,78 @@
+import os
+import socket
+import time
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from unbound_llm.backend import DaytonaBackend
+from unbound_llm.lifecycle import (
+    APP_LABEL,
+    HOST_LABEL,
+    PID_LABEL,
+    SandboxLifecycle,
+    is_orphan,
+)
+from unbound_llm.pool import SandboxPool
+
+
+def ago(hours: float) -> str:
+    return (datetime.now(UTC) - timedelta(hours=hours)).isoformat()
+
+
+def remote(**times) -> SimpleNamespace:
+    labels = {APP_LABEL: "1", HOST_LABEL: "elsewhere", PID_LABEL: "1"}
+    return SimpleNamespace(id="remote", labels=labels, **times)
+
+
+def test_same_host_owner_decides():
+    here = {APP_LABEL: "1", HOST_LABEL: socket.gethostname()}
+    mine = SimpleNamespace(labels={**here, PID_LABEL: str(os.getpid())})
+    assert not is_orphan(mine, min_age=0)
+    gone = SimpleNamespace(labels={**here, PID_LABEL: str(2**22 + 1)})
+    assert is_orphan(gone)
+
+
+def test_other_host_sandboxes_age_out_on_inactivity():
+    assert is_orphan(remote(created_at=ago(5)))
+    assert not is_orphan(remote(created_at=ago(1)))
+    # Old but still in use
+    assert not is_orphan(remote(created_at=ago(5), last_activity_at=ago(0.1)))
+    assert not is_orphan(remote(created_at=ago(5), updated_at=ago(0.1)))
+    assert is_orphan(remote(created_at=ago(9), last_activity_at=ago(4)))
+    assert not is_orphan(remote(created_at="not a time"))
+    assert not is_orphan(remote())
+
+
+def test_sweep_deletes_only_orphans():
+    deleted = []
+    stale, fresh = remote(created_at=ago(5)), remote(created_at=ago(5))
+    fresh.last_activity_at = ago(0)
+    backend = SimpleNamespace(list=lambda labels: [stale, fresh], delete=deleted.append)
+    with SandboxLifecycle(backend) as lifecycle:
+        assert lifecycle.sweep() == 1
+        lifecycle.flush()
+    assert deleted == [stale]
+
+
+def test_daytona_list_uses_a_query():
+    queries = []
+
+    def list_sandboxes(query):
+        queries.append(query)
+        return iter(["a", "b"])
+
+    backend = DaytonaBackend.__new__(DaytonaBackend)
+    backend.daytona = SimpleNamespace(list=list_sandboxes)
+    assert backend.list({APP_LABEL: "1"}) == ["a", "b"]
+    assert queries[0].labels == {APP_LABEL: "1"}
+
+
+def test_pool_keeps_leased_sandboxes_active(backend):
+    refreshed = []
+    pool = SandboxPool(backend, size=1, evict_interval=0.01)
+    with pool, pool.lease() as sandbox:
+        sandbox.refresh_activity = lambda: refreshed.append(sandbox.id)
+        deadline = time.monotonic() + 5
+        while len(refreshed) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert len(refreshed) >= 2
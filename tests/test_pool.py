@@ -0,0 +1,95 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from unbound_llm.pool import SandboxPool
+
+
+def test_lease_wipes_workspace_and_reuses_sandbox(pool):
+    with pool.lease() as sandbox:
+        workspace = Path(pool.backend.resolve(sandbox, pool.workspace))
+        (workspace / "scratch.txt").write_text("left over")
+        first = sandbox
+    with pool.lease() as sandbox:
+        assert sandbox is first
+        assert list(workspace.iterdir()) == []
+
+
+def test_reset_restores_baseline(backend, tmp_path):
+    baseline = tmp_path / "skills"
+    (baseline / "greet").mkdir(parents=True)
+    (baseline / "greet" / "SKILL.md").write_text("Say hello")
+    with SandboxPool(backend, size=1, baseline=baseline) as pool:
+        assert pool.has_baseline
+        with pool.lease() as sandbox:
+            skills = Path(backend.resolve(sandbox, pool.baseline_path))
+            (skills / "greet" / "SKILL.md").write_text("Say goodbye")
+            (skills / "extra").mkdir()
+        with pool.lease():
+            assert sorted(p.name for p in skills.iterdir()) == ["greet"]
+            assert (skills / "greet" / "SKILL.md").read_text() == "Say hello"
+
+
+def test_sandbox_that_raised_is_retired(pool):
+    retired = []
+    pool.on_retire.append(retired.append)
+    with pytest.raises(ValueError), pool.lease() as sandbox:
+        raise ValueError("broken")
+    pool.lifecycle.flush()
+    assert retired == [sandbox]
+    assert not Path(sandbox.root).exists()
+    with pool.lease() as replacement:
+        assert replacement is not sandbox
+    assert pool.total == 1
+
+
+def test_idle_sandboxes_above_size_are_evicted(backend):
+    with SandboxPool(backend, size=1, max_size=2, idle_timeout=0.0) as pool:
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        assert pool.total == 2
+        pool.evict()
+        assert pool.total == 1
+
+
+def test_quiet_pool_evicts_in_the_background(backend):
+    with SandboxPool(
+        backend, size=1, max_size=2, idle_timeout=0.0, evict_interval=0.01
+    ) as pool:
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        deadline = time.monotonic() + 5
+        while pool.total > 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.total == 1
+
+
+def test_retiring_above_size_does_not_overshoot_max_size(backend):
+    with SandboxPool(backend, size=1, max_size=3) as pool:
+        leased = [pool.acquire() for _ in range(3)]
+        pool.release(leased.pop(), healthy=False)
+        assert pool.total == 2
+        leased.append(pool.acquire())
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.05)
+        for sandbox in leased:
+            pool.release(sandbox)
+
+
+def test_sandbox_past_lifetime_is_replaced(backend):
+    with SandboxPool(backend, size=1, max_lifetime=0.05) as pool:
+        with pool.lease() as first:
+            pass
+        time.sleep(0.1)
+        with pool.lease() as second:
+            assert second is not first
+        pool.lifecycle.flush()
+        assert not Path(first.root).exists()
+
+
+def test_acquire_times_out_when_pool_is_exhausted(pool):
+    with pool.lease(), pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
@@ -0,0 +1,43 @@
+import asyncio
+import json
+
+from unbound_llm.executor import TaskExecutor
+from unbound_llm.runner import checkpoint_path, run_file, truncate_partial_line
+
+
+def test_truncate_partial_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"a": 1}\n{"b": ')
+    truncate_partial_line(path)
+    assert path.read_text() == '{"a": 1}\n'
+    truncate_partial_line(path)
+    assert path.read_text() == '{"a": 1}\n'
+
+    path.write_text("no newline at all")
+    truncate_partial_line(path)
+    assert path.read_text() == ""
+
+
+def test_run_file_resumes_after_crash(pool, claude, tmp_path):
+    log = tmp_path / "log"
+    tasks_path = tmp_path / "tasks.jsonl"
+    tasks_path.write_text(
+        "".join(
+            json.dumps({"id": task_id, "prompt": f"echo {task_id} >> {log}"}) + "\n"
+            for task_id in ["1", "2", "3"]
+        )
+    )
+    # A run that finished task 1 and died while recording task 2
+    output_path = tmp_path / "results.jsonl"
+    output_path.write_text(
+        json.dumps({"task_id": "1", "exit_code": 0}) + '\n{"task_id": "2", "exi'
+    )
+    checkpoint_path(output_path).write_text("1\n2")
+
+    executor = TaskExecutor(pool, flags=(), executable=claude, skills_path=None)
+    assert asyncio.run(run_file(executor, tasks_path, output_path)) == (2, 0)
+
+    assert log.read_text().split() == ["2", "3"]
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert [record["task_id"] for record in records] == ["1", "2", "3"]
+    assert checkpoint_path(output_path).read_text().split() == ["1", "2", "3"]
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import shlex
+import time
+
+import pytest
+
+from unbound_llm.executor import TaskExecutor
+from unbound_llm.scheduler import RateLimitScheduler, TokenBucket
+from unbound_llm.tasks import Task
+
+
+def test_token_bucket_refills_and_goes_into_debt():
+    bucket = TokenBucket(rate=10, capacity=10)
+    assert bucket.wait_time(10) == 0
+    bucket.take(10)
+    assert bucket.wait_time(5) == pytest.approx(0.5, abs=0.05)
+    bucket.take(10)
+    assert bucket.wait_time(1) == pytest.approx(1.1, abs=0.05)
+    # More than the bucket holds only waits for a full bucket
+    assert bucket.wait_time(100) == pytest.approx(2.0, abs=0.05)
+
+
+def test_higher_priority_is_admitted_first():
+    scheduler = RateLimitScheduler(requests_per_minute=None, max_concurrency=1)
+    order = []
+
+    async def attempt(task):
+        await scheduler.acquire(task)
+        order.append(task.id)
+        await asyncio.sleep(0.01)
+        scheduler.release()
+
+    async def main():
+        await scheduler.acquire(Task("first", ""))
+        waiting = [
+            asyncio.create_task(attempt(Task(task_id, "", priority=priority)))
+            for task_id, priority in [("low", 0), ("high", 5), ("high2", 5)]
+        ]
+        await asyncio.sleep(0.01)
+        assert order == []
+        scheduler.release()
+        await asyncio.gather(*waiting)
+
+    asyncio.run(main())
+    assert order == ["high", "high2", "low"]
+
+
+def test_concurrency_is_aimd():
+    scheduler = RateLimitScheduler(
+        requests_per_minute=None, max_concurrency=8, backoff=0.01
+    )
+    scheduler.in_flight = 4
+    scheduler.release(rate_limited=True)
+    assert scheduler.concurrency == 4
+    # Attempts already in flight when the limit hit do not halve it again
+    scheduler.release(rate_limited=True)
+    assert scheduler.concurrency == 4
+    assert scheduler.rate_limited == 2
+    scheduler.release(succeeded=False)
+    assert scheduler.concurrency == 4
+    scheduler.release()
+    assert scheduler.concurrency == 4.25
+    assert scheduler.in_flight == 0
+
+
+def test_rate_limit_holds_admissions_back():
+    scheduler = RateLimitScheduler(requests_per_minute=None, backoff=0.2)
+
+    async def main():
+        await scheduler.acquire(Task("1", ""))
+        scheduler.release(rate_limited=True)
+        start = time.monotonic()
+        await scheduler.acquire(Task("2", ""))
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) >= 0.2
+
+
+def test_estimates_are_corrected_from_reported_usage():
+    scheduler = RateLimitScheduler(
+        requests_per_minute=60,
+        tokens_per_minute=100_000,
+        tokens_per_task=20_000,
+        requests_per_task=2,
+    )
+
+    async def main():
+        await scheduler.acquire(Task("1", ""))
+
+    asyncio.run(main())
+    assert scheduler.requests.level == pytest.approx(58, abs=0.1)
+    assert scheduler.tokens.level == pytest.approx(80_000, abs=100)
+    scheduler.release(tokens=5_000, requests=10)
+    assert scheduler.requests.level == pytest.approx(50, abs=0.1)
+    assert scheduler.tokens.level == pytest.approx(95_000, abs=100)
+
+
+def test_executor_reports_turns_and_tokens_from_the_run(pool, claude):
+    final = {
+        "type": "result",
+        "result": "done",
+        "num_turns": 7,
+        "usage": {"input_tokens": 300, "output_tokens": 200},
+    }
+    scheduler = RateLimitScheduler(
+        requests_per_minute=600, tokens_per_minute=1_000_000, tokens_per_task=20_000
+    )
+    executor = TaskExecutor(
+        pool,
+        flags=(),
+        executable=claude,
+        skills_path=None,
+        scheduler=scheduler,
+    )
+
+    async def main():
+        task = Task("1", f"echo {shlex.quote(json.dumps(final))}")
+        return [result async for result in executor.run([task])]
+
+    [task_result] = asyncio.run(main())
+    assert task_result.output == "done"
+    assert (task_result.tokens, task_result.turns) == (500, 7)
+    assert scheduler.in_flight == 0
+    assert scheduler.requests.level == pytest.approx(593, abs=1)
+    assert scheduler.tokens.level == pytest.approx(999_500, abs=1000)
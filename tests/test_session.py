@@ -0,0 +1,128 @@
+import pytest
+
+from unbound_llm.session import AgentSession, flag_args
+from unbound_llm.tasks import Task
+
+# Stands in for claude-agent-sdk: the client answers each prompt with its turn
+# number in the conversation and the prompt. "read <path>" also makes a Read
+# tool call, "sleep" never answers and "exit" kills the agent.
+FAKE_SDK = """
+import asyncio, os
+from dataclasses import dataclass
+
+@dataclass
+class ToolUseBlock:
+    name: str
+    input: dict
+
+@dataclass
+class AssistantMessage:
+    content: list
+
+@dataclass
+class ResultMessage:
+    result: str
+    is_error: bool
+    num_turns: int
+    duration_ms: int
+    total_cost_usd: float
+    usage: dict
+    session_id: str
+
+class ClaudeAgentOptions:
+    def __init__(self, **options):
+        self.options = options
+
+class ClaudeSDKClient:
+    def __init__(self, options):
+        self.turns = 0
+        self.prompt = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def query(self, prompt):
+        self.prompt = prompt
+
+    async def interrupt(self):
+        self.prompt = None
+
+    async def receive_response(self):
+        prompt, self.prompt = self.prompt, None
+        if prompt is None:
+            return
+        if prompt == "exit":
+            os._exit(1)
+        if prompt == "sleep":
+            await asyncio.sleep(3600)
+        if prompt == "/clear":
+            self.turns = 0
+        else:
+            self.turns += 1
+        if prompt.startswith("read "):
+            block = ToolUseBlock("Read", {"file_path": prompt[5:]})
+            yield AssistantMessage([block])
+        usage = {"input_tokens": 3, "output_tokens": 4}
+        yield ResultMessage(
+            f"{self.turns}: {prompt}", False, 1, 10, 0.0, usage, "session"
+        )
+"""
+
+
+@pytest.fixture
+def agent(sandbox, tmp_path, monkeypatch):
+    (tmp_path / "claude_agent_sdk.py").write_text(FAKE_SDK)
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+    root = str(sandbox.root)
+    with AgentSession(sandbox, cwd=root, agent_dir=root, connect_timeout=30) as agent:
+        yield agent
+
+
+def test_tasks_share_a_conversation_until_reset(agent, sandbox):
+    skills = sandbox.root / "skills"
+    (skills / "greet").mkdir(parents=True)
+    (skills / "greet" / "SKILL.md").write_text("Say hello")
+
+    first = agent.run(Task("a", "hello"))
+    assert (first.exit_code, first.output) == (0, "1: hello")
+    assert (first.tokens, first.turns) == (7, 1)
+
+    second = agent.run(
+        Task("b", f"read {skills}/greet/SKILL.md"), skills_path=str(skills)
+    )
+    assert second.output.startswith("2: ")
+    assert second.skills_used == ["greet"]
+    assert second.skill_names == ["greet"]
+
+    fresh = agent.run(Task("c", "hello"), reset=True)
+    assert fresh.output == "1: hello"
+    assert agent.tasks == 3
+
+
+def test_timed_out_task_leaves_the_agent_usable(agent):
+    result = agent.run(Task("slow", "sleep", timeout=0.5))
+    assert result.exit_code == 1
+    assert result.output == "Timed out after 0.5s"
+    assert agent.run(Task("next", "hello")).output == "1: hello"
+
+
+def test_dead_agent_is_replaced_on_the_next_run(agent):
+    agent.run(Task("a", "hello"))
+    with pytest.raises(RuntimeError, match="Agent exited"):
+        agent.run(Task("crash", "exit"))
+    assert not agent.running
+    # A new agent, so a new conversation
+    assert agent.run(Task("b", "hello")).output == "1: hello"
+    assert agent.running
+
+
+def test_flag_args():
+    flags = ["--dangerously-skip-permissions", "--model", "sonnet", "-v", "--x"]
+    assert flag_args(flags) == {
+        "dangerously-skip-permissions": None,
+        "model": "sonnet",
+        "x": None,
+    }
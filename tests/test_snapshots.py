@@ -0,0 +1,51 @@
+from unbound_llm.snapshots import build_inputs, dockerfile_hash
+
+
+def write_context(root):
+    (root / "scripts").mkdir(parents=True)
+    (root / "scripts" / "setup.sh").write_text("echo setup")
+    (root / "requirements.txt").write_text("requests\n")
+    dockerfile = root / "Dockerfile"
+    dockerfile.write_text(
+        "FROM python:3.13 AS base\n"
+        "COPY requirements.txt /app/\n"
+        "ADD --chmod=755 scripts /app/scripts  # helpers\n"
+        "ADD https://example.com/tool.tar.gz /opt/\n"
+        "COPY --from=base /app /copy\n"
+        "RUN pip install -r /app/requirements.txt\n"
+    )
+    return dockerfile
+
+
+def test_build_inputs_lists_local_copy_sources(tmp_path):
+    dockerfile = write_context(tmp_path)
+    assert build_inputs(dockerfile) == [
+        tmp_path / "requirements.txt",
+        tmp_path / "scripts" / "setup.sh",
+    ]
+
+
+def test_hash_changes_with_dockerfile_and_inputs_only(tmp_path):
+    dockerfile = write_context(tmp_path)
+    before = dockerfile_hash(dockerfile)
+    assert dockerfile_hash(dockerfile) == before
+
+    (tmp_path / "unrelated.txt").write_text("not part of the build")
+    assert dockerfile_hash(dockerfile) == before
+
+    (tmp_path / "scripts" / "setup.sh").write_text("echo changed")
+    changed_input = dockerfile_hash(dockerfile)
+    assert changed_input != before
+
+    dockerfile.write_text(dockerfile.read_text() + "RUN true\n")
+    assert dockerfile_hash(dockerfile) != changed_input
+
+
+def test_extra_inputs_are_hashed(tmp_path):
+    dockerfile = write_context(tmp_path)
+    extra = tmp_path / "settings.json"
+    extra.write_text("{}")
+    with_extra = dockerfile_hash(dockerfile, [extra])
+    assert with_extra != dockerfile_hash(dockerfile)
+    extra.write_text('{"changed": true}')
+    assert dockerfile_hash(dockerfile, [extra]) != with_extra
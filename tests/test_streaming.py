@@ -0,0 +1,107 @@
+import asyncio
+import json
+import shlex
+import time
+
+import pytest
+
+from unbound_llm.streaming import TaskStream
+from unbound_llm.tasks import Task
+
+RESULT = {
+    "type": "result",
+    "result": "done",
+    "is_error": False,
+    "usage": {"input_tokens": 10, "output_tokens": 5, "cache_read_input_tokens": 99},
+    "total_cost_usd": 0.01,
+}
+
+
+def emit(*events, pause: float = 0.0) -> str:
+    """Shell snippet printing `events` as stream-json, pausing after each"""
+    return "; ".join(
+        f"echo {shlex.quote(json.dumps(event))}; sleep {pause}" for event in events
+    )
+
+
+def stream(sandbox, claude, prompt, **kwargs) -> TaskStream:
+    return TaskStream(
+        sandbox,
+        Task("1", prompt, **kwargs),
+        flags=(),
+        executable=claude,
+        cwd=sandbox.root,
+    )
+
+
+async def collect(task_stream, delay: float = 0.0):
+    received = []
+    async with task_stream:
+        async for event in task_stream:
+            received.append((time.perf_counter(), event))
+            await asyncio.sleep(delay)
+    return received
+
+
+def test_events_arrive_in_order_while_the_agent_runs(sandbox, claude):
+    prompt = emit(
+        {"type": "system", "subtype": "init"},
+        {"type": "assistant", "message": {"content": []}},
+        RESULT,
+        pause=0.3,
+    )
+    task_stream = stream(sandbox, claude, prompt)
+    received = asyncio.run(collect(task_stream))
+    finished = time.perf_counter()
+
+    assert [event["type"] for _, event in received] == [
+        "system",
+        "assistant",
+        "result",
+    ]
+    # The first event is handed over long before the run ends
+    assert finished - received[0][0] > 0.5
+    metrics = task_stream.metrics
+    assert metrics.time_to_first_event < metrics.duration - 0.5
+    assert metrics.events == 3 and metrics.dropped_events == 0
+    assert (metrics.input_tokens, metrics.output_tokens) == (10, 5)
+    assert metrics.tokens == 15
+    assert metrics.cost_usd == 0.01
+    assert task_stream.exit_code == 0
+    assert task_stream.result["result"] == "done"
+
+
+def test_timeout_deletes_the_session(sandbox, claude):
+    task_stream = stream(
+        sandbox, claude, emit({"type": "system"}) + "; sleep 30", timeout=0.5
+    )
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        asyncio.run(collect(task_stream))
+    assert time.perf_counter() - start < 10
+    assert sandbox.process._sessions == {}
+
+
+def test_closing_early_deletes_the_session(sandbox, claude):
+    async def first_event():
+        async with stream(sandbox, claude, emit({"type": "a"}) + "; sleep 30") as s:
+            async for event in s:
+                return event
+
+    assert asyncio.run(first_event())["type"] == "a"
+    assert sandbox.process._sessions == {}
+
+
+def test_slow_reader_keeps_only_the_newest_events(sandbox, claude):
+    events = [{"type": "assistant", "n": n} for n in range(20)]
+    task_stream = stream(sandbox, claude, emit(*events, RESULT))
+    task_stream.max_queued_events = 5
+    received = [event for _, event in asyncio.run(collect(task_stream, delay=0.2))]
+
+    assert task_stream.metrics.events == 21
+    assert task_stream.metrics.dropped_events == 21 - len(received)
+    assert task_stream.metrics.dropped_events > 0
+    assert received[-1]["type"] == "result"
+    numbers = [event["n"] for event in received[:-1]]
+    assert numbers == sorted(numbers)
+    assert task_stream.metrics.tokens == 15
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from unbound_llm.manifest import MANIFEST_NAME
+from unbound_llm.sync import sync_directory
+
+
+def remote_files(root: Path) -> dict[str, str]:
+    return {
+        str(path.relative_to(root)): path.read_text()
+        for path in root.rglob("*")
+        if path.is_file() and path.name != MANIFEST_NAME
+    }
+
+
+def test_incremental_sync_sends_changes_and_deletes(sandbox, tmp_path):
+    local = tmp_path / "local"
+    (local / "a").mkdir(parents=True)
+    (local / "b" / "deep").mkdir(parents=True)
+    (local / "a" / "x.txt").write_text("x")
+    (local / "b" / "deep" / "y.txt").write_text("y")
+    (local / "keep.txt").write_text("keep")
+
+    remote = Path(sandbox.root) / "skills"
+    first = sync_directory(sandbox, local, remote, incremental=True)
+    assert first.files == 3
+    assert remote_files(remote) == {
+        "a/x.txt": "x",
+        "b/deep/y.txt": "y",
+        "keep.txt": "keep",
+    }
+
+    (local / "a" / "x.txt").write_text("x2")
+    (local / "b" / "deep" / "y.txt").unlink()
+    (local / "c.txt").write_text("c")
+    # Files and empty directories the sync did not write are never deleted
+    (remote / "scratch.txt").write_text("mine")
+    (remote / "a" / "empty").mkdir()
+    second = sync_directory(sandbox, local, remote, incremental=True)
+    assert (second.files, second.files_deleted) == (2, 1)
+    assert remote_files(remote) == {
+        "a/x.txt": "x2",
+        "c.txt": "c",
+        "keep.txt": "keep",
+        "scratch.txt": "mine",
+    }
+    assert not (remote / "b").exists()
+    assert (remote / "a" / "empty").is_dir()
+
+    third = sync_directory(sandbox, local, remote, incremental=True)
+    assert (third.files, third.files_deleted) == (0, 0)
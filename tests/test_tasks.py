@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+
+from unbound_llm.harvest import read_sandbox_manifest
+from unbound_llm.manifest import build_manifest
+from unbound_llm.tasks import Task, run_task
+
+
+def test_snapshot_rehashes_only_files_whose_size_or_mtime_changed(sandbox):
+    skills = Path(sandbox.root) / "skills"
+    (skills / "greet").mkdir(parents=True)
+    (skills / "greet" / "SKILL.md").write_text("Say hello")
+    (skills / "shout" / "assets").mkdir(parents=True)
+    (skills / "shout" / "assets" / "big.bin").write_bytes(b"a" * 4096)
+    known = read_sandbox_manifest(sandbox, skills)
+    assert known == build_manifest(skills)
+
+    # Same size and mtime: taken on trust, so the stale hash is kept
+    big = skills / "shout" / "assets" / "big.bin"
+    stat = big.stat()
+    big.write_bytes(b"b" * 4096)
+    os.utime(big, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    # A new mtime is enough to be read again
+    (skills / "greet" / "SKILL.md").write_text("Say hi!!!")
+    quick = read_sandbox_manifest(sandbox, skills, known)
+    assert (
+        quick["shout/assets/big.bin"]["sha256"]
+        == (known["shout/assets/big.bin"]["sha256"])
+    )
+    assert (
+        quick["greet/SKILL.md"]["sha256"]
+        == (build_manifest(skills)["greet/SKILL.md"]["sha256"])
+    )
+    assert quick["greet/SKILL.md"]["sha256"] != known["greet/SKILL.md"]["sha256"]
+
+
+def test_run_task_snapshots_skills_in_the_same_exec(sandbox, claude):
+    skills = Path(sandbox.root) / "skills"
+    (skills / "greet").mkdir(parents=True)
+    (skills / "greet" / "SKILL.md").write_text("Say hello")
+    before = read_sandbox_manifest(sandbox, skills)
+    trips = sandbox.round_trips
+
+    task = Task("1", f"mkdir {skills}/notes && echo hi > {skills}/notes/SKILL.md")
+    result = run_task(
+        sandbox, task, (), claude, skills_path=str(skills), skills_before=before
+    )
+    assert result.ok
+    assert sandbox.round_trips == trips + 1
+    assert result.skills_delta.added == ["notes"]
+    assert result.skills == read_sandbox_manifest(sandbox, skills)
@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+
+from unbound_llm.tracing import Tracer
+
+
+def test_spans_nest_within_a_task_but_not_across_tasks():
+    tracer = Tracer()
+
+    async def child(name):
+        with tracer.span(name):
+            await asyncio.sleep(0)
+
+    async def main():
+        with tracer.span("run"):
+            await asyncio.gather(child("a"), child("b"))
+        with tracer.span("other"):
+            pass
+
+    asyncio.run(main())
+    spans = {span.name: span for span in tracer.spans}
+    run = spans["run"]
+    assert run.parent_id is None
+    for name in ["a", "b"]:
+        assert spans[name].parent_id == run.span_id
+        assert spans[name].trace_id == run.trace_id
+    assert spans["other"].parent_id is None
+    assert spans["other"].trace_id != run.trace_id
+
+
+def test_failed_span_records_error_and_reraises():
+    tracer = Tracer()
+    with pytest.raises(ValueError), tracer.span("work", files=2) as span:
+        span.set(bytes=10)
+        raise ValueError("boom")
+    [record] = tracer.records()
+    assert record["error"] == "ValueError: boom"
+    assert record["attributes"] == {"files": 2, "bytes": 10}
+    assert record["duration"] >= 0
+
+
+def test_max_spans_keeps_the_latest():
+    tracer = Tracer(max_spans=2)
+    for name in ["a", "b", "c"]:
+        with tracer.span(name):
+            pass
+    assert [span.name for span in tracer.spans] == ["b", "c"]
+
+
+def test_otlp_export(tmp_path):
+    tracer = Tracer(service_name="test")
+    with tracer.span("parent", ok=True, count=3) as span:
+        span.set(ratio=0.5, path="/x")
+        with tracer.span("child"):
+            pass
+    path = tmp_path / "trace.json"
+    tracer.export(path, "otlp")
+
+    [resource] = json.loads(path.read_text())["resourceSpans"]
+    assert resource["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "test"}}
+    ]
+    child, parent = resource["scopeSpans"][0]["spans"]
+    assert child["parentSpanId"] == parent["spanId"]
+    assert "parentSpanId" not in parent
+    assert parent["status"] == {"code": 1}
+    assert int(parent["endTimeUnixNano"]) >= int(child["endTimeUnixNano"])
+    assert parent["attributes"] == [
+        {"key": "ok", "value": {"boolValue": True}},
+        {"key": "count", "value": {"intValue": "3"}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+        {"key": "path", "value": {"stringValue": "/x"}},
+    ]
+
+
+def test_json_export_writes_one_span_per_line(tmp_path):
+    tracer = Tracer()
+    for name in ["a", "b"]:
+        with tracer.span(name):
+            pass
+    path = tmp_path / "trace.jsonl"
+    tracer.export(path)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["name"] for record in records] == ["a", "b"]
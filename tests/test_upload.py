@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from unbound_llm.tracing import tracer
+from unbound_llm.upload import upload_paths, upload_tree
+
+
+def upload_batches() -> list[tuple[int, int]]:
+    return [
+        (record["attributes"]["files"], record["attributes"]["bytes"])
+        for record in tracer.records()
+        if record["name"] == "upload"
+    ]
+
+
+def test_uploads_are_grouped_under_the_in_flight_cap(sandbox, tmp_path):
+    sizes = [40, 40, 30, 100, 10]
+    uploads = []
+    for i, size in enumerate(sizes):
+        path = tmp_path / f"file{i}"
+        path.write_bytes(bytes([i]) * size)
+        uploads.append((path, Path(sandbox.root) / "out" / path.name))
+
+    tracer.clear()
+    assert upload_paths(sandbox, uploads, max_in_flight_bytes=80) == sum(sizes)
+    # A file over the cap travels alone
+    assert upload_batches() == [(2, 80), (1, 30), (1, 100), (1, 10)]
+    assert sandbox.round_trips == 4
+    for local_path, remote_path in uploads:
+        assert remote_path.read_bytes() == local_path.read_bytes()
+
+
+def test_upload_tree_keeps_the_layout(sandbox, tmp_path):
+    local = tmp_path / "tree"
+    (local / "a" / "b").mkdir(parents=True)
+    (local / "a" / "b" / "data.bin").write_bytes(b"\0\1\2")
+    (local / "top.txt").write_text("top")
+    remote = Path(sandbox.root) / "tree"
+    assert upload_tree(sandbox, local, remote) == 6
+    assert (remote / "a" / "b" / "data.bin").read_bytes() == b"\0\1\2"
+    assert (remote / "top.txt").read_text() == "top"
@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pytest
+
+from unbound_llm.harvest import read_sandbox_manifest
+from unbound_llm.usage import SkillUsage, plan_prune, prune_skills
+
+DAY = 86400.0
+NOW = 100 * DAY
+
+
+def manifest(**sizes) -> dict:
+    return {
+        f"{name}/SKILL.md": {"size": size, "sha256": name}
+        for name, size in sizes.items()
+    }
+
+
+@pytest.fixture
+def usage(tmp_path):
+    usage = SkillUsage(tmp_path / "usage.db")
+    yield usage
+    usage.close()
+
+
+def test_usage_tracks_last_activity(usage):
+    usage.seen(["a", "b"], when=1.0)
+    usage.seen(["a"], when=5.0)
+    usage.record(["b", "c"], when=10.0)
+    usage.record(["b"], when=20.0)
+    assert usage.last_active() == {"a": 1.0, "b": 20.0, "c": 10.0}
+    assert usage.stats() == [("b", 2, 20.0), ("c", 1, 10.0), ("a", 0, None)]
+    usage.forget(["b"])
+    assert "b" not in usage.last_active()
+
+
+def test_idle_skills_are_evicted_but_pinned_and_unknown_ones_kept(usage):
+    usage.seen(["cold", "warm", "skill-creator"], when=NOW - 30 * DAY)
+    usage.record(["warm"], when=NOW - DAY)
+    plan = plan_prune(
+        manifest(cold=10, warm=20, new=30, **{"skill-creator": 40}),
+        usage,
+        max_age=7 * DAY,
+        now=NOW,
+    )
+    assert plan.evict == {"cold": "idle 30.0 days"}
+    assert plan.kept == ["new", "skill-creator", "warm"]
+    assert (plan.bytes_before, plan.bytes_after) == (100, 90)
+
+
+def test_budgets_evict_least_recently_active_first(usage):
+    for age, name in enumerate(["d", "c", "b", "a"]):
+        usage.record([name], when=NOW - age * DAY)
+    sizes = manifest(a=100, b=100, c=100, d=100)
+
+    by_count = plan_prune(sizes, usage, max_skills=2, now=NOW)
+    assert sorted(by_count.evict) == ["a", "b"]
+    assert by_count.evict["a"] == "over 2 skills"
+
+    by_bytes = plan_prune(sizes, usage, max_bytes=250, pinned={"a"}, now=NOW)
+    assert sorted(by_bytes.evict) == ["b", "c"]
+    assert by_bytes.kept == ["a", "d"]
+
+
+def test_plan_does_not_touch_usage(usage):
+    plan_prune(manifest(a=1), usage, max_age=DAY, now=NOW)
+    assert usage.last_active() == {}
+
+
+def test_prune_archives_then_deletes(sandbox, tmp_path):
+    skills = Path(sandbox.root) / "skills"
+    for name in ["keep", "drop"]:
+        (skills / name).mkdir(parents=True)
+        (skills / name / "SKILL.md").write_text(name)
+    archive = tmp_path / "archive"
+    prune_skills(
+        sandbox,
+        skills,
+        ["drop"],
+        archive_to=archive,
+        archive_path=str(Path(sandbox.root) / "prune.tar.gz"),
+    )
+    assert (archive / "drop" / "SKILL.md").read_text() == "drop"
+    assert sorted(read_sandbox_manifest(sandbox, skills)) == ["keep/SKILL.md"]